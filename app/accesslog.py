@@ -0,0 +1,184 @@
+"""Structured access log with a per-request timing breakdown.
+
+Every request gets a correlation id (``X-Request-ID``, taken from the request
+when it is a sane value) and a JSON log line on the ``app.access`` logger::
+
+    {"event": "request", "request_id": "...", "method": "GET",
+     "route": "/portofolio/{slug}", "path": "/portofolio/andrew", "status": 200,
+     "total_ms": 41.2, "db_ms": 30.1, "db_queries": 3, "render_ms": 6.4,
+     "auth_ms": 0.0, "io_ms": 0.0}
+
+Phases are measured where the time is spent: ``db`` through SQLAlchemy cursor
+events (and ``record_queries`` for psycopg pipelines), ``auth`` around Argon2 and JWT verification, ``render`` around Jinja
+template rendering and ``io`` around upload writes. A query issued while a
+template renders (lazy loading) counts in both ``db`` and ``render``.
+
+Normal requests are logged with probability ``ACCESS_LOG_SAMPLE_RATE``.
+Requests slower than ``SLOW_REQUEST_MS`` (with the SQL they ran), 5xx
+responses and queries slower than ``SLOW_QUERY_MS`` are always logged.
+"""
+import json
+import logging
+import random
+import re
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from uuid import uuid4
+from jinja2 import Template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+
+logger = logging.getLogger("app.access")
+
+REQUEST_ID_HEADER = b"x-request-id"
+_VALID_REQUEST_ID = re.compile(rb"[A-Za-z0-9._-]{1,64}")
+
+# SQL yang disimpan per request untuk log slow request
+MAX_RECORDED_QUERIES = 50
+
+PHASES = ("auth", "db", "render", "io")
+
+
+class RequestTimings:
+    def __init__(self, request_id: str, scope: dict):
+        self.request_id = request_id
+        self.scope = scope
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.db_queries = 0
+        self.queries: list[tuple[str, float]] = []
+
+    @property
+    def route(self) -> str | None:
+        # diisi oleh router FastAPI setelah path cocok dengan sebuah route
+        return getattr(self.scope.get("route"), "path", None)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def phase(name: str):
+    """Add the time spent in the block to phase ``name`` of the current request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.phases[name] += time.perf_counter() - start
+
+
+class TimedTemplate(Template):
+    def render(self, *args, **kwargs):
+        with phase("render"):
+            return super().render(*args, **kwargs)
+
+
+def install(env):
+    """Measure template rendering of a Jinja environment (before templates are loaded)."""
+    env.template_class = TimedTemplate
+
+
+def _emit(record: dict, level: int = logging.INFO):
+    logger.log(level, json.dumps(record, default=str))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_queries([statement], time.perf_counter() - conn.info["query_start"].pop())
+
+
+def record_queries(statements: list[str], elapsed: float):
+    """Account SQL sent in one round trip, also when it bypassed SQLAlchemy's cursor events."""
+    statement = ";\n".join(statements)
+    timings = _current.get()
+    if timings is not None:
+        timings.phases["db"] += elapsed
+        timings.db_queries += len(statements)
+        if len(timings.queries) < MAX_RECORDED_QUERIES:
+            timings.queries.append((statement, elapsed))
+    if elapsed * 1000 >= settings.slow_query_ms:
+        # parameter tidak ikut di-log, bisa berisi email atau hash password
+        _emit({
+            "event": "slow_query",
+            "request_id": timings.request_id if timings else None,
+            "route": timings.route if timings else None,
+            "ms": round(elapsed * 1000, 1),
+            "sql": statement,
+        }, logging.WARNING)
+
+
+class AccessLogMiddleware:
+    """Assign a request id, time the request and write the access log line."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER and _VALID_REQUEST_ID.fullmatch(value):
+                request_id = value.decode()
+                break
+        timings = RequestTimings(request_id or uuid4().hex, scope)
+        token = _current.set(timings)
+        response_status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, timings.request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._log(scope, timings, response_status, time.perf_counter() - start)
+
+    def _log(self, scope, timings: RequestTimings, response_status: int, total: float):
+        slow = total * 1000 >= settings.slow_request_ms
+        if not (slow or response_status >= 500 or random.random() < settings.access_log_sample_rate):
+            return
+
+        record = {
+            "event": "slow_request" if slow else "request",
+            "request_id": timings.request_id,
+            "method": scope["method"],
+            "route": timings.route,
+            "path": scope["path"],
+            "status": response_status,
+            "total_ms": round(total * 1000, 1),
+            "db_queries": timings.db_queries,
+        }
+        for name, seconds in timings.phases.items():
+            record[f"{name}_ms"] = round(seconds * 1000, 1)
+        if slow:
+            record["queries"] = [{"ms": round(ms * 1000, 1), "sql": sql} for sql, ms in timings.queries]
+        _emit(record, logging.WARNING if slow or response_status >= 500 else logging.INFO)
+
+
+def setup_logging():
+    """Write ``app.access`` as bare JSON lines to stdout, separate from other loggers."""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
@@ -0,0 +1,215 @@
+"""Per-page stylesheets built from ``static/styles.css``.
+
+``styles.css`` stays the single hand-edited source. The build splits it into
+minified bundles holding only the rules the bundle's templates use, and
+extracts the critical (above-the-fold) rules of the public pages so they can
+be inlined in ``<head>``::
+
+    static/dist/public.min.css   index.html, portfolio.html (loaded lazily)
+    static/dist/admin.min.css    login and admin pages
+
+A rule is kept when every class/id in one of its selectors occurs somewhere in
+the template source (markup or script, so classes toggled from JavaScript
+count too). Keyframes are kept when a kept rule animates with them. The
+critical part of a page only looks at the markup before its fold marker.
+
+The app builds the bundles at startup; build by hand with::
+
+    python -m app.assets
+"""
+import os
+import re
+import tempfile
+from pathlib import Path
+from markupsafe import Markup
+
+APP_DIR = Path(__file__).resolve().parent
+STATIC_DIR = APP_DIR / "static"
+TEMPLATES_DIR = APP_DIR / "templates"
+SOURCE = STATIC_DIR / "styles.css"
+DIST_DIR = STATIC_DIR / "dist"
+
+PUBLIC_TEMPLATES = ["index.html", "portfolio.html"]
+BUNDLES = {
+    "public.min.css": PUBLIC_TEMPLATES,
+    "admin.min.css": [
+        "login.html", "admin.html", "profile_form.html",
+        "skills.html", "skill_form.html",
+        "projects.html", "project_form.html",
+        "experiences.html", "experience_form.html",
+    ],
+}
+
+# markup sebelum marker ini terlihat tanpa scroll; None berarti seluruh halaman
+FOLD_MARKERS = {
+    "index.html": None,
+    "portfolio.html": '<section id="about"',
+}
+
+_SELECTOR_NAMES = re.compile(r"[.#](-?[A-Za-z_][\w-]*)")
+_TOKENS = re.compile(r"-?[A-Za-z_][\w-]*")
+_ANIMATION = re.compile(r"animation(?:-name)?\s*:([^;]+)")
+_STRINGS = re.compile(r"(\"[^\"]*\"|'[^']*')")
+
+
+class Block:
+    """A top-level rule or at-rule; ``children`` is set for @media/@supports."""
+
+    def __init__(self, prelude: str, body: str, children: list["Block"] | None = None):
+        self.prelude = prelude
+        self.body = body
+        self.children = children
+
+    @property
+    def keyframes(self) -> str | None:
+        if self.prelude.startswith("@keyframes"):
+            return self.prelude.split()[1]
+        return None
+
+
+def parse(css: str) -> list[Block]:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    blocks, pos = [], 0
+    while True:
+        start = css.find("{", pos)
+        if start == -1:
+            return blocks
+        depth, end = 1, start + 1
+        while depth:
+            if end >= len(css):
+                raise ValueError("Kurung kurawal di styles.css tidak seimbang")
+            depth += {"{": 1, "}": -1}.get(css[end], 0)
+            end += 1
+        prelude, body = " ".join(css[pos:start].split()), css[start + 1:end - 1]
+        nested = prelude.startswith(("@media", "@supports"))
+        blocks.append(Block(prelude, body, parse(body) if nested else None))
+        pos = end
+
+
+def _minify(text: str, declarations: bool) -> str:
+    parts = _STRINGS.split(text)
+    for i in range(0, len(parts), 2):  # bagian ganjil adalah string literal
+        part = " ".join(parts[i].split())
+        part = re.sub(r"\s*([{};,>])\s*", r"\1", part)
+        if declarations:
+            part = re.sub(r":\s+", ":", part)
+        parts[i] = part
+    return "".join(parts).replace(";}", "}")
+
+
+def serialize(blocks: list[Block]) -> str:
+    out = []
+    for block in blocks:
+        if block.children is not None:
+            inner = serialize(block.children)
+        else:
+            inner = _minify(block.body, declarations=True).rstrip(";")
+        out.append(f"{_minify(block.prelude, declarations=False)}{{{inner}}}")
+    return "".join(out)
+
+
+def select(blocks: list[Block], tokens: set[str]) -> list[Block]:
+    """Keep the rules (and selectors) whose classes/ids all occur in ``tokens``."""
+    kept = _select_rules(blocks, tokens)
+    animations = set()
+    for block in _flatten(kept):
+        for match in _ANIMATION.finditer(block.body):
+            animations.update(_TOKENS.findall(match.group(1)))
+    return [
+        block for block in kept
+        if block.keyframes is None or block.keyframes in animations
+    ]
+
+
+def _select_rules(blocks: list[Block], tokens: set[str]) -> list[Block]:
+    kept = []
+    for block in blocks:
+        if block.keyframes is not None:
+            kept.append(block)
+        elif block.children is not None:
+            children = _select_rules(block.children, tokens)
+            if children:
+                kept.append(Block(block.prelude, block.body, children))
+        elif block.prelude.startswith("@"):
+            kept.append(block)
+        else:
+            selectors = [
+                s.strip() for s in block.prelude.split(",")
+                if set(_SELECTOR_NAMES.findall(s)) <= tokens
+            ]
+            if selectors:
+                kept.append(Block(", ".join(selectors), block.body))
+    return kept
+
+
+def _flatten(blocks: list[Block]):
+    for block in blocks:
+        if block.children is not None:
+            yield from _flatten(block.children)
+        else:
+            yield block
+
+
+def _template_tokens(template: str, above_fold: bool = False) -> set[str]:
+    source = (TEMPLATES_DIR / template).read_text(encoding="utf-8")
+    marker = FOLD_MARKERS.get(template) if above_fold else None
+    if marker is not None:
+        source = source[:source.index(marker)]
+    return set(_TOKENS.findall(source))
+
+
+def _write_if_changed(path: Path, content: bytes):
+    if path.exists() and path.read_bytes() == content:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+_built: dict | None = None
+
+
+def build(output_dir: Path = DIST_DIR) -> dict:
+    """Write the bundles and return them together with the critical CSS per page."""
+    global _built
+    blocks = parse(SOURCE.read_text(encoding="utf-8"))
+    result = {"bundles": {}, "critical": {}}
+    for name, templates in BUNDLES.items():
+        tokens = set().union(*(_template_tokens(t) for t in templates))
+        css = serialize(select(blocks, tokens))
+        _write_if_changed(output_dir / name, css.encode())
+        result["bundles"][name] = css
+    for template in PUBLIC_TEMPLATES:
+        result["critical"][template] = serialize(select(blocks, _template_tokens(template, above_fold=True)))
+    _built = result
+    return result
+
+
+def ensure_built() -> dict:
+    return _built if _built is not None else build()
+
+
+def critical_css(template: str) -> Markup:
+    """Critical CSS of a public page, for a ``<style>`` block in its ``<head>``."""
+    return Markup(ensure_built()["critical"][template])
+
+
+def install(env):
+    """Make ``critical_css`` available to the templates of a Jinja environment."""
+    env.globals["critical_css"] = critical_css
+
+
+def main():
+    result = build()
+    source_size = SOURCE.stat().st_size
+    print(f"styles.css: {source_size} bytes")
+    for name, css in result["bundles"].items():
+        print(f"dist/{name}: {len(css)} bytes")
+    for template, css in result["critical"].items():
+        print(f"critical {template}: {len(css)} bytes")
+
+
+if __name__ == "__main__":
+    main()
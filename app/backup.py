@@ -0,0 +1,276 @@
+"""Export and restore the portfolio data as one archive.
+
+The archive is a ``.tar.gz`` holding a versioned ``manifest.json``, one CSV
+file per table written by PostgreSQL ``COPY`` and the uploaded photos the
+profiles point to::
+
+    manifest.json          format, version, columns, row counts, sha256
+    data/users.csv         ... profiles, skills, experiences, projects
+    uploads/<file>         files under static/uploads referenced by profiles
+
+All tables are exported in one ``REPEATABLE READ`` transaction, so the archive
+is a consistent snapshot. A restore loads them with ``COPY FROM`` in one
+transaction and resets the id sequences; the target must be empty unless
+``--replace`` is given (which truncates the five tables first). The photos are
+extracted and checked before that transaction commits and moved into place
+after it, so a damaged archive leaves the database untouched::
+
+    python -m app.backup export backup.tar.gz
+    python -m app.backup restore backup.tar.gz [--replace]
+
+Columns are named in the manifest, so an archive restores into a newer schema
+as long as the added columns are nullable or have a default. Jobs, the site
+state and the page cache are not exported; the default profile is picked again
+after a restore. Restoring invalidates the page cache and the static snapshot
+like any other write; processes with the in-memory cache only see that after a
+restart. PostgreSQL only.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from . import models, profiles
+from .database import Sessionlocal, engine
+from .routers.admin import UPLOAD_DIR
+
+FORMAT = "portfolio-backup"
+FORMAT_VERSION = 1
+
+# urutan foreign key: parent sebelum child
+TABLES = [
+    models.UserLogin.__table__,
+    models.Profile.__table__,
+    models.Skill.__table__,
+    models.Experience.__table__,
+    models.Project.__table__,
+]
+
+UPLOAD_PREFIX = "/static/uploads/"
+COPY_CHUNK_SIZE = 1 << 16
+
+
+class BackupError(Exception):
+    pass
+
+
+def _require_postgres(connection):
+    if connection.dialect.name != "postgresql":
+        raise BackupError(f"Backup memakai COPY dan hanya mendukung PostgreSQL, bukan {connection.dialect.name}")
+
+
+def _column_list(connection, columns) -> str:
+    quote = connection.dialect.identifier_preparer.quote
+    return ", ".join(quote(name) for name in columns)
+
+
+def _upload_path(image: str | None) -> Path | None:
+    if not image or not image.startswith(UPLOAD_PREFIX):
+        return None
+    name = Path(image).name
+    return UPLOAD_DIR / name if name else None
+
+
+def _add_file(tar: tarfile.TarFile, name: str, fileobj, size: int):
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(datetime.now(timezone.utc).timestamp())
+    tar.addfile(info, fileobj)
+
+
+def export(path: Path) -> dict:
+    """Write a backup archive to ``path`` and return its manifest."""
+    manifest = {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "tables": {},
+        "uploads": [],
+        "missing_uploads": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        with engine.connect() as connection:
+            _require_postgres(connection)
+            connection.execution_options(isolation_level="REPEATABLE READ")
+            dbapi_connection = connection.connection.driver_connection
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SET TRANSACTION READ ONLY")
+            for table in TABLES:
+                columns = list(table.c.keys())
+                target = workdir / f"{table.name}.csv"
+                digest = hashlib.sha256()
+                with target.open("wb") as f, cursor.copy(
+                    f"COPY (SELECT {_column_list(connection, columns)} FROM {table.name} ORDER BY id) "
+                    "TO STDOUT WITH (FORMAT csv, HEADER)"
+                ) as copy:
+                    for chunk in copy:
+                        f.write(chunk)
+                        digest.update(chunk)
+                manifest["tables"][table.name] = {
+                    "file": f"data/{table.name}.csv",
+                    "columns": columns,
+                    "rows": cursor.rowcount,
+                    "sha256": digest.hexdigest(),
+                }
+            images = cursor.execute("SELECT DISTINCT image FROM profiles WHERE image IS NOT NULL").fetchall()
+            dbapi_connection.rollback()
+
+        uploads = []
+        for (image,) in images:
+            source = _upload_path(image)
+            if source is None or not source.is_file():
+                manifest["missing_uploads"].append(image)
+                continue
+            uploads.append(source)
+            manifest["uploads"].append(source.name)
+
+        with tarfile.open(path, "w:gz") as tar:
+            # manifest di depan, restore bisa memeriksanya sebelum membaca data
+            data = json.dumps(manifest, indent=2).encode()
+            _add_file(tar, "manifest.json", io.BytesIO(data), len(data))
+            for table in TABLES:
+                source = workdir / f"{table.name}.csv"
+                with source.open("rb") as f:
+                    _add_file(tar, manifest["tables"][table.name]["file"], f, source.stat().st_size)
+            for source in uploads:
+                tar.add(source, arcname=f"uploads/{source.name}", recursive=False)
+    return manifest
+
+
+def read_manifest(tar: tarfile.TarFile) -> dict:
+    try:
+        manifest = json.load(tar.extractfile("manifest.json"))
+    except KeyError:
+        raise BackupError("Archive tidak berisi manifest.json") from None
+    if manifest.get("format") != FORMAT:
+        raise BackupError("Archive bukan backup portfolio")
+    if manifest.get("version", 0) > FORMAT_VERSION:
+        raise BackupError(f"Backup versi {manifest['version']} lebih baru dari yang didukung ({FORMAT_VERSION})")
+    for table in TABLES:
+        entry = manifest["tables"].get(table.name)
+        if entry is None:
+            raise BackupError(f"Tabel {table.name} tidak ada di archive")
+        unknown = set(entry["columns"]) - set(table.c.keys())
+        if unknown:
+            raise BackupError(f"Kolom {', '.join(sorted(unknown))} di {table.name} tidak ada di schema saat ini")
+    return manifest
+
+
+def _load_table(cursor, connection, table, entry: dict, source):
+    digest = hashlib.sha256()
+    with cursor.copy(
+        f"COPY {table.name} ({_column_list(connection, entry['columns'])}) FROM STDIN WITH (FORMAT csv, HEADER)"
+    ) as copy:
+        while chunk := source.read(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+            copy.write(chunk)
+    if digest.hexdigest() != entry["sha256"]:
+        raise BackupError(f"Checksum {entry['file']} tidak cocok, archive rusak")
+    if cursor.rowcount != entry["rows"]:
+        raise BackupError(f"{table.name}: {cursor.rowcount} baris dimuat, manifest menyebut {entry['rows']}")
+
+
+def _reset_sequence(cursor, table):
+    # id berikutnya melanjutkan id terbesar yang dipulihkan (atau mulai dari 1 di tabel kosong)
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+        f"FROM {table.name}"
+    )
+
+
+def _stage_uploads(tar: tarfile.TarFile, names: list[str], staging: Path) -> list[Path]:
+    staged = []
+    for name in names:
+        member = f"uploads/{name}"
+        # nama dari archive tidak dipercaya begitu saja, hanya basename yang dipakai
+        target = staging / Path(name).name
+        try:
+            source = tar.extractfile(member)
+            if source is None:
+                raise BackupError(f"{member} di archive bukan file")
+            with source, target.open("wb") as f:
+                shutil.copyfileobj(source, f)
+        except KeyError:
+            raise BackupError(f"{member} ada di manifest tapi tidak ada di archive") from None
+        except (tarfile.TarError, EOFError, zlib.error, OSError) as exc:
+            raise BackupError(f"{member} gagal diekstrak: {exc}") from exc
+        staged.append(target)
+    return staged
+
+
+def restore(path: Path, replace: bool = False) -> dict:
+    """Load a backup archive into the database and the upload directory."""
+    models.Base.metadata.create_all(bind=engine)
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    # staging di dalam UPLOAD_DIR: filesystem yang sama, jadi os.replace di akhir atomic
+    with tarfile.open(path, "r:gz") as tar, Sessionlocal() as db, \
+            tempfile.TemporaryDirectory(dir=UPLOAD_DIR, prefix=".restore-") as staging:
+        manifest = read_manifest(tar)
+        connection = db.connection()
+        _require_postgres(connection)
+        cursor = connection.connection.driver_connection.cursor()
+
+        if replace:
+            names = ", ".join(table.name for table in TABLES)
+            # CASCADE ikut mengosongkan site_state yang menunjuk ke profiles
+            cursor.execute(f"TRUNCATE {names} RESTART IDENTITY CASCADE")
+        else:
+            for table in TABLES:
+                if cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table.name})").fetchone()[0]:
+                    raise BackupError(f"Tabel {table.name} tidak kosong, pakai --replace untuk menimpa")
+
+        for table in TABLES:
+            entry = manifest["tables"][table.name]
+            _load_table(cursor, connection, table, entry, tar.extractfile(entry["file"]))
+            _reset_sequence(cursor, table)
+
+        # foto yang hilang/rusak membatalkan restore sebelum database di-commit
+        staged = _stage_uploads(tar, manifest["uploads"], Path(staging))
+
+        # cache, snapshot dan versi profile di-invalidate saat commit
+        profiles.mark_changed(db)
+        db.commit()
+        profiles.ensure_profile_state(db)
+
+        for source in staged:
+            os.replace(source, UPLOAD_DIR / source.name)
+    return manifest
+
+
+def _summary(manifest: dict) -> str:
+    rows = ", ".join(f"{name} {entry['rows']}" for name, entry in manifest["tables"].items())
+    return f"{rows}; {len(manifest['uploads'])} uploads"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or restore the portfolio data")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="write a backup archive")
+    export_parser.add_argument("path", type=Path)
+    restore_parser = commands.add_parser("restore", help="load a backup archive")
+    restore_parser.add_argument("path", type=Path)
+    restore_parser.add_argument("--replace", action="store_true", help="truncate the tables before loading")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "export":
+            manifest = export(args.path)
+            print(f"Backup written to {args.path} ({_summary(manifest)})")
+            for image in manifest["missing_uploads"]:
+                print(f"warning: {image} not found, not included")
+        else:
+            manifest = restore(args.path, replace=args.replace)
+            print(f"Restored {args.path} from {manifest['created_at']} ({_summary(manifest)})")
+    except BackupError as exc:
+        parser.exit(1, f"error: {exc}\n")
+
+
+if __name__ == "__main__":
+    main()
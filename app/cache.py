@@ -0,0 +1,238 @@
+"""Cache for rendered pages and API payloads, shared between workers.
+
+Every process keeps a small in-memory cache. With ``CACHE_BACKEND=redis`` values
+are also stored in Redis, and invalidations are broadcast over pub/sub so the
+in-memory caches of the other workers drop the same entries. Entries are
+grouped by tag and invalidated per tag; profile changes invalidate the
+``portfolio`` tag after commit (see ``app/profiles.py``). The portfolio keys
+also carry the profile version, so correctness does not depend on that
+invalidation reaching every worker in time.
+
+``get_or_set`` recomputes a missing value only once at a time: per key within a
+process (through a fixed set of striped locks, so keys that embed a version do
+not leave a lock behind each), and through a short Redis lock across processes.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from .config import settings
+
+try:
+    import redis
+except ImportError:  # optional, only needed for the shared backend
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "cache:invalidate"
+
+# jumlah lock untuk get_or_set per proses; key berbeda di stripe yang sama hanya saling menunggu
+KEY_LOCK_STRIPES = 64
+
+
+class MemoryBackend:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[bytes, float, tuple[str, ...]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at, _ = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float, tags: tuple[str, ...] = ()):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl, tags)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, tag: str):
+        with self._lock:
+            for key in [k for k, (_, _, tags) in self._data.items() if tag in tags]:
+                del self._data[key]
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    def __init__(self, url: str, prefix: str = "cache"):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis membutuhkan package redis")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self._key(key))
+
+    def set(self, key: str, value: bytes, ttl: float, tags: tuple[str, ...] = ()):
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(key), value, px=int(ttl * 1000))
+            for tag in tags:
+                pipe.sadd(self._key(f"tag:{tag}"), self._key(key))
+                pipe.pexpire(self._key(f"tag:{tag}"), int(ttl * 1000))
+            pipe.execute()
+
+    def invalidate(self, tag: str):
+        tag_key = self._key(f"tag:{tag}")
+        keys = self.client.smembers(tag_key)
+        # nama key ikut dikirim: cache lokal worker lain mengisi key dari redis tanpa tag
+        names = [k.decode()[len(self.prefix) + 1:] for k in keys]
+        with self.client.pipeline() as pipe:
+            if keys:
+                pipe.delete(*keys)
+            pipe.delete(tag_key)
+            pipe.publish(INVALIDATE_CHANNEL, json.dumps({"tag": tag, "keys": names}))
+            pipe.execute()
+
+    def acquire(self, key: str, timeout: float) -> bool:
+        return bool(self.client.set(self._key(f"lock:{key}"), b"1", nx=True, px=int(timeout * 1000)))
+
+    def release(self, key: str):
+        self.client.delete(self._key(f"lock:{key}"))
+
+    def clear(self):
+        for key in self.client.scan_iter(self._key("*")):
+            self.client.delete(key)
+
+
+class Cache:
+    def __init__(self, local: MemoryBackend, shared: RedisBackend | None, ttl: float, local_ttl: float, lock_timeout: float):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.lock_timeout = lock_timeout
+        # RLock: compute yang memanggil get_or_set lagi tidak deadlock kalau key-nya jatuh di stripe yang sama
+        self._key_locks = [threading.RLock() for _ in range(KEY_LOCK_STRIPES)]
+        self._subscriber = None
+
+    def get(self, key: str) -> bytes | None:
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except redis.RedisError:
+                logger.warning("Redis cache tidak tersedia, membaca tanpa cache bersama")
+                return None
+            if value is not None:
+                self.local.set(key, value, self.local_ttl)
+        return value
+
+    def set(self, key: str, value: bytes, tags: tuple[str, ...] = (), ttl: float | None = None):
+        ttl = ttl or self.ttl
+        self.local.set(key, value, min(ttl, self.local_ttl) if self.shared is not None else ttl, tags)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, ttl, tags)
+            except redis.RedisError:
+                logger.warning("Redis cache tidak tersedia, nilai %s hanya disimpan lokal", key)
+
+    def invalidate(self, *tags: str):
+        for tag in tags:
+            self.local.invalidate(tag)
+            if self.shared is not None:
+                try:
+                    self.shared.invalidate(tag)
+                except redis.RedisError:
+                    logger.exception("Gagal invalidasi cache %s di redis", tag)
+
+    def get_or_set(self, key: str, compute, tags: tuple[str, ...] = (), ttl: float | None = None) -> bytes:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock_for(key):
+            value = self.get(key)
+            if value is not None:
+                return value
+            if self.shared is None:
+                value = compute()
+                self.set(key, value, tags, ttl)
+                return value
+            try:
+                return self._get_or_set_shared(key, compute, tags, ttl)
+            except redis.RedisError:
+                value = compute()
+                self.set(key, value, tags, ttl)
+                return value
+
+    def _get_or_set_shared(self, key, compute, tags, ttl) -> bytes:
+        deadline = time.monotonic() + self.lock_timeout
+        while not self.shared.acquire(key, self.lock_timeout):
+            # worker lain sedang menghitung nilai yang sama, tunggu hasilnya
+            time.sleep(0.02)
+            value = self.get(key)
+            if value is not None:
+                return value
+            if time.monotonic() > deadline:
+                return compute()
+        try:
+            value = compute()
+            self.set(key, value, tags, ttl)
+            return value
+        finally:
+            self.shared.release(key)
+
+    def _lock_for(self, key: str) -> threading.RLock:
+        return self._key_locks[hash(key) % KEY_LOCK_STRIPES]
+
+    def start(self):
+        """Listen for invalidations published by other workers."""
+        if self.shared is None or self._subscriber is not None:
+            return
+        pubsub = self.shared.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{INVALIDATE_CHANNEL: self._on_invalidate})
+        self._subscriber = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def stop(self):
+        if self._subscriber is not None:
+            self._subscriber.stop()
+            self._subscriber = None
+
+    def _on_invalidate(self, message):
+        try:
+            data = json.loads(message["data"])
+            self.local.invalidate(data["tag"])
+            self.local.delete(*data.get("keys", []))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Pesan invalidasi cache tidak valid: %r", message)
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+
+def _create_cache() -> Cache:
+    shared = RedisBackend(settings.cache_redis_url) if settings.cache_backend == "redis" else None
+    return Cache(
+        MemoryBackend(settings.cache_local_size),
+        shared,
+        ttl=settings.cache_ttl_seconds,
+        local_ttl=settings.cache_local_ttl_seconds,
+        lock_timeout=settings.cache_lock_timeout_seconds,
+    )
+
+
+cache = _create_cache()
@@ -19,5 +19,57 @@ class Settings(BaseSettings):
     algorithm: str 
     access_token_expire_minutes: int 
     database_url: str = ''
+    # connection pool per proses (per worker app/server.py), juga untuk replica
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+
+    # read replica opsional (URL SQLAlchemy lengkap) untuk route publik yang hanya membaca
+    database_replica_url: str = ''
+    database_primary_sticky_seconds: int = 5
+    database_replica_retry_seconds: int = 30
+
+    # rate limit untuk endpoint auth (login dan create user), per window detik
+    rate_limit_backend: str = 'memory'  # 'memory' atau 'redis'
+    rate_limit_redis_url: str = ''
+    rate_limit_window_seconds: int = 60
+    rate_limit_per_ip: int = 20
+    rate_limit_per_email: int = 5
+    auth_max_concurrent_hashes: int = 4
+
+    # background job queue (lihat app/jobs.py)
+    job_workers: int = 2
+    job_max_attempts: int = 3
+    job_retry_delay_seconds: float = 2.0
+    job_stale_after_seconds: int = 600
+
+    # snapshot statis halaman publik (lihat app/prerender.py)
+    prerender_enabled: bool = True
+    prerender_dir: str = ''
+
+    # server produksi (python -m app.server), PORT diisi otomatis oleh Render
+    port: int = 8000
+    web_host: str = '0.0.0.0'
+    web_workers: int = 0  # 0 = jumlah CPU, maksimal 4 (lihat app/server.py)
+    web_keepalive_seconds: int = 5
+    web_backlog: int = 2048
+    web_graceful_timeout_seconds: int = 30
+    web_forwarded_allow_ips: str = '127.0.0.1'
+    web_log_level: str = 'info'
+
+    # access log JSON (lihat app/accesslog.py); slow request/query selalu di-log
+    access_log_sample_rate: float = 0.1
+    slow_request_ms: int = 1000
+    slow_query_ms: int = 200
+
+    # batas waktu pengecekan /readyz (lihat app/routers/health.py)
+    health_check_timeout_seconds: float = 2.0
+
+    # cache halaman/payload publik (lihat app/cache.py)
+    cache_backend: str = 'memory'  # 'memory' atau 'redis'
+    cache_redis_url: str = ''
+    cache_ttl_seconds: int = 300
+    cache_local_ttl_seconds: int = 30  # hanya dipakai bersama redis
+    cache_local_size: int = 256
+    cache_lock_timeout_seconds: float = 5.0
 
 settings = Settings()
\ No newline at end of file
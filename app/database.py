@@ -1,21 +1,192 @@
-from sqlalchemy import create_engine
+import time
+from datetime import datetime, timezone
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from . import accesslog
 from .config import settings
 
 SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
 
-# SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg://{settings.database_url}"
+# DATABASE_URL (URL SQLAlchemy lengkap) menimpa konfigurasi di atas, misalnya untuk
+# benchmark lokal dengan sqlite:///bench.db sebagai pengganti PostgreSQL
+if settings.database_url:
+    SQLALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+def _create_engine(url: str, **kwargs):
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_size=settings.database_pool_size, max_overflow=settings.database_max_overflow, **kwargs)
+
+    sqlite_engine = create_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+
+    # sqlite tidak punya now(), dipakai oleh server_default kolom created_at;
+    # foreign key (ON DELETE CASCADE) juga baru ditegakkan setelah PRAGMA ini
+    @event.listens_for(sqlite_engine, "connect")
+    def _sqlite_now(dbapi_connection, connection_record):
+        dbapi_connection.create_function("now", 0, lambda: datetime.now(timezone.utc).isoformat(" "))
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    return sqlite_engine
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
 
 Sessionlocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
+def execute_pipeline(db: Session, *statements) -> list[list]:
+    """Execute Core statements in the transaction of ``db`` in one round trip.
+
+    With psycopg the statements are sent in pipeline mode and only the final
+    sync waits for the server; other drivers (SQLite) run them one by one.
+    Returns the rows of each statement (empty for statements without rows).
+    """
+    connection = db.connection()
+    if connection.dialect.driver != "psycopg":
+        results = [connection.execute(statement) for statement in statements]
+        return [result.all() if result.returns_rows else [] for result in results]
+
+    # langsung ke driver: result SQLAlchemy membaca cursor.description sebelum
+    # pipeline di-sync, sehingga statement dengan RETURNING kehilangan hasilnya.
+    # Cursor event tidak terpanggil, jadi query dicatat ke access log di sini dan
+    # error driver dibungkus seperti yang dilakukan engine.
+    dialect = connection.dialect
+    compiled = [
+        statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+        for statement in statements
+    ]
+    from psycopg.rows import namedtuple_row  # baris dengan atribut per kolom, seperti Row SQLAlchemy
+
+    dbapi_connection = connection.connection.driver_connection
+    cursors = []
+    start = time.perf_counter()
+    try:
+        with dbapi_connection.pipeline():
+            for query in compiled:
+                cursor = dbapi_connection.cursor(row_factory=namedtuple_row)
+                cursor.execute(query.string, query.params)
+                cursors.append(cursor)
+    except dialect.loaded_dbapi.Error as exc:
+        # error baru terlihat saat sync, statement yang gagal tidak diketahui: laporkan semuanya
+        invalidated = dialect.is_disconnect(exc, dbapi_connection, None)
+        if invalidated:
+            connection.invalidate(exc)
+        raise DBAPIError.instance(
+            ";\n".join(query.string for query in compiled), [query.params for query in compiled],
+            exc, dialect.loaded_dbapi.Error, connection_invalidated=invalidated, dialect=dialect, ismulti=True,
+        ) from exc
+    finally:
+        accesslog.record_queries([query.string for query in compiled], time.perf_counter() - start)
+    return [cursor.fetchall() if cursor.description else [] for cursor in cursors]
+
+def get_db(request: Request):
     db = Sessionlocal()
+    # dipakai untuk menandai request yang menulis ke primary (lihat PrimaryStickyMiddleware)
+    db.info["request"] = request
     try:
         yield db
     finally:
         db.close()
+
+
+# Read replica (opsional). Route publik yang hanya membaca memakai get_read_db; request dari
+# user yang baru saja menulis tetap ke primary selama DATABASE_PRIMARY_STICKY_SECONDS, dan
+# replica yang error dilewati selama DATABASE_REPLICA_RETRY_SECONDS.
+STICKY_COOKIE = "db_primary_until"
+
+replica_engine = _create_engine(settings.database_replica_url, pool_pre_ping=True) if settings.database_replica_url else None
+_replica_down_until = 0.0
+
+def mark_replica_down():
+    global _replica_down_until
+    _replica_down_until = time.monotonic() + settings.database_replica_retry_seconds
+
+def replica_available() -> bool:
+    return replica_engine is not None and time.monotonic() >= _replica_down_until
+
+if replica_engine is not None:
+    @event.listens_for(replica_engine, "handle_error")
+    def _replica_error(context):
+        if context.is_disconnect:
+            mark_replica_down()
+
+def _primary_sticky(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def _replica_connection(request: Request):
+    if not replica_available() or _primary_sticky(request):
+        return None
+    try:
+        return replica_engine.connect()
+    except DBAPIError:
+        mark_replica_down()
+        return None
+
+class ReadSession(Session):
+    """Session on the replica that moves to the primary when a read fails.
+
+    Covers a replica that accepts connections but errors or times out on
+    queries; the failed statement is retried once on the primary.
+    """
+
+    def _read(self, method, statement, *args, **kwargs):
+        try:
+            return method(statement, *args, **kwargs)
+        except (OperationalError, InterfaceError):
+            if self.bind is engine:
+                raise
+            mark_replica_down()
+            # rollback meng-expire objek yang sudah dimuat, akses berikutnya dibaca dari primary
+            self.rollback()
+            self.bind = engine
+            return method(statement, *args, **kwargs)
+
+    # Query, get() dan lazy/selectin load juga lewat execute()
+    def execute(self, statement, *args, **kwargs):
+        return self._read(super().execute, statement, *args, **kwargs)
+
+    def scalar(self, statement, *args, **kwargs):
+        return self._read(super().scalar, statement, *args, **kwargs)
+
+    def scalars(self, statement, *args, **kwargs):
+        return self._read(super().scalars, statement, *args, **kwargs)
+
+def get_read_db(request: Request):
+    connection = _replica_connection(request)
+    db = ReadSession(bind=connection, autoflush=False) if connection is not None else Sessionlocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        if connection is not None:
+            connection.close()
+
+@event.listens_for(Sessionlocal, "after_commit")
+def _remember_write(session):
+    request = session.info.get("request")
+    if request is not None:
+        request.state.db_written = True
+
+class PrimaryStickyMiddleware:
+    """Set a short-lived cookie after a request committed to the primary."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and scope.get("state", {}).get("db_written"):
+                seconds = settings.database_primary_sticky_seconds
+                cookie = f"{STICKY_COOKIE}={time.time() + seconds:.0f}; Max-Age={seconds}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,110 @@
+"""Preload hints for the public pages.
+
+``/``, ``/portofolio/`` and ``/portofolio/{slug}`` get ``Link: rel=preload``
+headers for their stylesheet and the profile photo. The links are known before
+the route touches the database: the stylesheet URL is fixed (or comes from the
+snapshot manifest) and the photo URL is remembered per path in the cache. It is
+stored per profile version when the page is rendered (``render_profile_page``)
+and copied to a path the first time that path serves the page, which may be a
+cache hit rendered for another path (``/portofolio/`` and the slug URL). Servers that implement the ASGI
+``http.response.early_hint`` extension (e.g. Hypercorn) also get a
+``103 Early Hints`` response before the route runs; uvicorn does not support
+it yet, but proxies/CDNs such as Cloudflare turn the ``Link`` header of the
+final response into 103 responses for the next visitors.
+"""
+from urllib.parse import quote
+from starlette.concurrency import run_in_threadpool
+from . import prerender
+from .cache import cache
+
+STYLESHEET = "/static/dist/public.min.css"
+
+# path publik -> halaman snapshot (app/prerender.py)
+SNAPSHOT_PAGES = {"/": "index.html", "/portofolio/": "portofolio/index.html"}
+
+# path di bawah /portofolio/ yang bukan halaman profile
+NON_PAGE_PATHS = {"/portofolio/all"}
+
+
+def is_public_page(path: str) -> bool:
+    if path in SNAPSHOT_PAGES:
+        return True
+    return path.startswith("/portofolio/") and path.count("/") == 2 and path not in NON_PAGE_PATHS
+
+
+def link(url: str, as_: str, fetchpriority: str | None = None) -> str:
+    value = f"<{quote(url, safe=':/?#[]@!$&()*+=%~')}>; rel=preload; as={as_}"
+    if fetchpriority:
+        value += f"; fetchpriority={fetchpriority}"
+    return value
+
+
+def page_links(stylesheet: str, image: str | None) -> list[str]:
+    links = [link(stylesheet, "style")]
+    if image:
+        links.append(link(image, "image", "high"))
+    return links
+
+
+def _image_key(path: str) -> str:
+    return f"preload:{path}"
+
+
+def _profile_image_key(key) -> str:
+    return f"preload:profile:{key.id}:{key.version}"
+
+
+def remember_image(key, image: str | None):
+    """Store the photo URL of profile ``key`` (``id``, ``version``) as rendered (empty if it has none)."""
+    cache.set(_profile_image_key(key), (image or "").encode(), tags=("portfolio",))
+
+
+def remember_path(path: str, key):
+    """Use the photo remembered for profile ``key`` in the preload links of ``path``."""
+    image = cache.get(_profile_image_key(key))
+    if image is not None:
+        cache.set(_image_key(path), image, tags=("portfolio",))
+
+
+async def links_for(path: str) -> tuple[list[str], bool]:
+    """Return the preload links for ``path`` and whether the photo URL was known."""
+    snapshot = SNAPSHOT_PAGES.get(path)
+    if snapshot is not None:
+        links = prerender.preload_links(snapshot)
+        if links is not None:
+            return links, True
+    if path == "/":
+        return page_links(STYLESHEET, None), True
+
+    key = _image_key(path)
+    image = cache.local.get(key)
+    if image is None and cache.shared is not None:
+        image = await run_in_threadpool(cache.get, key)
+    return page_links(STYLESHEET, image.decode() if image else None), image is not None
+
+
+class PreloadMiddleware:
+    """Send early hints and ``Link`` preload headers for the public pages."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not is_public_page(scope["path"]):
+            return await self.app(scope, receive, send)
+
+        links, complete = await links_for(scope["path"])
+        # route mengisi foto untuk path ini kalau belum diketahui (request.state.preload_image_known)
+        scope.setdefault("state", {})["preload_image_known"] = complete
+        if "http.response.early_hint" in scope.get("extensions", {}):
+            await send({"type": "http.response.early_hint", "links": [value.encode() for value in links]})
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                # foto belum diketahui sebelum render pertama, coba lagi setelah route selesai
+                current = links if complete else (await links_for(scope["path"]))[0]
+                headers = [(b"link", value.encode()) for value in current]
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
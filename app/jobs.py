@@ -0,0 +1,212 @@
+"""In-process background job queue for side effects that run after a commit.
+
+Handlers enqueue jobs on their own session; the job row is written in the same
+transaction as the change, and handed to the asyncio workers only once the
+transaction commits (a rollback drops it)::
+
+    jobs.enqueue(db, "delete_upload", path=profile.image)
+    db.commit()
+
+Workers run with bounded concurrency and retry failed jobs. A job row is deleted
+once it succeeds, so anything left in the ``jobs`` table after a crash is picked
+up again: at start, and every ``JOB_STALE_AFTER_SECONDS`` for jobs a crashed
+process left ``running``. Claiming a job is atomic, so every process can recover.
+"""
+import asyncio
+import inspect
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, or_, update
+from sqlalchemy.orm import Session
+from . import models
+from .config import settings
+from .database import Sessionlocal
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+
+def task(name: str):
+    """Register a function (sync or async) as the handler for jobs called ``name``."""
+    def decorator(func):
+        _tasks[name] = func
+        return func
+    return decorator
+
+
+def enqueue(db: Session, name: str, **payload):
+    """Add a job to the session; it is dispatched after ``db.commit()``."""
+    if name not in _tasks:
+        raise ValueError(f"Unknown job: {name}")
+    job = models.Job(name=name, payload=payload, status="pending", attempts=0)
+    db.add(job)
+    db.info.setdefault("pending_jobs", []).append(job)
+    return job
+
+
+class JobQueue:
+    def __init__(self, workers: int, max_attempts: int, retry_delay: float):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._workers: list[asyncio.Task] = []
+        self._sweeper: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        await self._requeue_left_over()
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self, timeout: float = 10.0):
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Job queue stopped with %d job(s) left, they will run on next start", self._queue.qsize())
+        for task in (*self._workers, self._sweeper):
+            task.cancel()
+        await asyncio.gather(*self._workers, self._sweeper, return_exceptions=True)
+        self._queue = None
+        self._workers = []
+        self._sweeper = None
+
+    def dispatch(self, job_ids: list[int]):
+        """Hand committed jobs to the workers; safe to call from any thread."""
+        if not self.running or not job_ids:
+            return
+        for job_id in job_ids:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, job_id)
+
+    async def drain(self):
+        """Wait until every dispatched job has finished (used by scripts and tests)."""
+        if self.running:
+            await self._queue.join()
+
+    async def _requeue_left_over(self):
+        # job yang sudah ada di antrian lokal tidak masalah masuk lagi, _claim hanya berhasil sekali
+        for job_id in await asyncio.to_thread(self._recover):
+            self._queue.put_nowait(job_id)
+
+    async def _sweep(self):
+        # job "running" dari proses yang crash baru bisa diambil lagi setelah stale
+        while True:
+            await asyncio.sleep(settings.job_stale_after_seconds)
+            try:
+                await self._requeue_left_over()
+            except Exception:
+                logger.exception("Recovering left-over jobs failed")
+
+    def _recover(self) -> list[int]:
+        stale = datetime.now(timezone.utc) - timedelta(seconds=settings.job_stale_after_seconds)
+        with Sessionlocal() as db:
+            rows = (
+                db.query(models.Job.id)
+                .filter(or_(
+                    models.Job.status == "pending",
+                    (models.Job.status == "running") & (models.Job.updated_at < stale),
+                ))
+                .order_by(models.Job.id)
+                .all()
+            )
+        return [row.id for row in rows]
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("Job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: int):
+        job = await asyncio.to_thread(self._claim, job_id)
+        if job is None:
+            return  # sudah diambil worker/proses lain atau sudah selesai
+        name, payload, attempts = job
+        func = _tasks.get(name)
+
+        while True:
+            attempts += 1
+            try:
+                if func is None:
+                    raise LookupError(f"Unknown job: {name}")
+                if inspect.iscoroutinefunction(func):
+                    await func(**payload)
+                else:
+                    await asyncio.to_thread(func, **payload)
+            except Exception as exc:
+                logger.warning("Job %s (%s) attempt %d failed: %s", job_id, name, attempts, exc)
+                if func is None or attempts >= self.max_attempts:
+                    await asyncio.to_thread(self._finish, job_id, "failed", attempts, repr(exc))
+                    return
+                await asyncio.to_thread(self._finish, job_id, "running", attempts, repr(exc))
+                await asyncio.sleep(self.retry_delay * 2 ** (attempts - 1))
+            else:
+                await asyncio.to_thread(self._finish, job_id, None, attempts, None)
+                return
+
+    def _claim(self, job_id: int):
+        stale = datetime.now(timezone.utc) - timedelta(seconds=settings.job_stale_after_seconds)
+        with Sessionlocal() as db:
+            claimed = db.execute(
+                update(models.Job)
+                .where(
+                    models.Job.id == job_id,
+                    or_(
+                        models.Job.status == "pending",
+                        (models.Job.status == "running") & (models.Job.updated_at < stale),
+                    ),
+                )
+                .values(status="running", updated_at=datetime.now(timezone.utc))
+                .returning(models.Job.name, models.Job.payload, models.Job.attempts)
+            ).first()
+            db.commit()
+        return tuple(claimed) if claimed else None
+
+    def _finish(self, job_id: int, status: str | None, attempts: int, error: str | None):
+        with Sessionlocal() as db:
+            if status is None:
+                db.query(models.Job).filter(models.Job.id == job_id).delete()
+            else:
+                db.query(models.Job).filter(models.Job.id == job_id).update({
+                    "status": status,
+                    "attempts": attempts,
+                    "last_error": error,
+                    "updated_at": datetime.now(timezone.utc),
+                })
+            db.commit()
+
+
+queue = JobQueue(settings.job_workers, settings.job_max_attempts, settings.job_retry_delay_seconds)
+
+
+@event.listens_for(Session, "before_commit")
+def _collect_jobs(session):
+    # flush dulu: listener before_flush (misalnya app/prerender.py) bisa menambah job
+    session.flush()
+    jobs = session.info.pop("pending_jobs", None)
+    if jobs:
+        session.info["committed_jobs"] = [job.id for job in jobs]
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_jobs(session):
+    queue.dispatch(session.info.pop("committed_jobs", []))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_jobs(session):
+    session.info.pop("pending_jobs", None)
+    session.info.pop("committed_jobs", None)
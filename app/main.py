@@ -1,22 +1,56 @@
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from .routers import portofolio, auth, admin
-from .database import engine
-from . import models
+from fastapi.responses import FileResponse, HTMLResponse
+from .routers import portofolio, auth, admin, health
+from .database import engine, Sessionlocal, PrimaryStickyMiddleware, replica_engine
+from . import models, jobs, prerender, profiles, assets, accesslog
+from .cache import cache
+from .hints import PreloadMiddleware
+from .templating import templates
+from .accesslog import AccessLogMiddleware
 
 # create all database tables, jika menggunakan alembic, maka baris ini bisa di comment atau dihapus
 models.Base.metadata.create_all(bind=engine)
 
 
-app = FastAPI()
+def prepare():
+    """One-time startup writes: slugs and default profile pointer, and the snapshot.
+
+    The pre-fork server (app/server.py) runs this once in the master, so workers
+    do not race on it. Left-over jobs are recovered by every worker's queue.
+    """
+    with Sessionlocal() as db:
+        profiles.ensure_profile_state(db)
+    prerender.refresh_if_outdated()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not app.state.prepared:
+        await asyncio.to_thread(prepare)
+    cache.start()
+    await jobs.queue.start()
+    yield
+    await jobs.queue.stop()
+    cache.stop()
+
+
+# stylesheet per halaman dari static/styles.css (lihat app/assets.py)
+assets.build()
+
+app = FastAPI(lifespan=lifespan)
+# diset True oleh app/server.py setelah prepare() dijalankan di master
+app.state.prepared = False
 
 app.mount("/static", StaticFiles(directory=str(Path(__file__).resolve().parent / "static")), name="static")
 
-templates = Jinja2Templates(directory=str(Path(__file__).resolve().parent / "templates"))
+# aset ber-hash dari snapshot statis (app/prerender.py)
+prerender.OUTPUT_DIR.joinpath("assets").mkdir(parents=True, exist_ok=True)
+app.mount("/assets", StaticFiles(directory=str(prerender.OUTPUT_DIR / "assets")), name="assets")
 
 origins = [
     "https://www.google.com",
@@ -34,9 +68,24 @@ app.add_middleware(
 
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
+    snapshot = prerender.page_path("index.html")
+    if snapshot:
+        return FileResponse(snapshot, media_type="text/html")
     return templates.TemplateResponse("index.html", {"request": request})
 
+# Link preload header (dan 103 Early Hints) untuk halaman publik
+app.add_middleware(PreloadMiddleware)
+
+# request yang menulis ke primary membaca dari primary juga untuk sementara waktu
+if replica_engine is not None:
+    app.add_middleware(PrimaryStickyMiddleware)
+
+# paling luar, supaya waktu semua middleware lain ikut terukur
+accesslog.setup_logging()
+app.add_middleware(AccessLogMiddleware)
+
 # Include routers
 app.include_router(portofolio.router)
 app.include_router(auth.router)
-app.include_router(admin.router)
\ No newline at end of file
+app.include_router(admin.router)
+app.include_router(health.router)
\ No newline at end of file
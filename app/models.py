@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, text, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, text, ForeignKey, Date, JSON
 from .database import Base
 from sqlalchemy.orm import relationship
 
@@ -6,7 +6,7 @@ class Profile(Base):
     __tablename__ = "profiles"
 
     id = Column(Integer, primary_key=True, index=True)
-    userInput = Column(Integer, ForeignKey("users.id"), nullable=False)   
+    userInput = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
     name = Column(String, nullable=False)
     age = Column(Integer, nullable=False)
@@ -14,10 +14,13 @@ class Profile(Base):
     university = Column(String, nullable=False)
     biography = Column(String, nullable=False)
     image = Column(String, nullable=True)
+    slug = Column(String, nullable=True, unique=True, index=True)
+    version = Column(Integer, nullable=False, server_default="1")
 
-    skills = relationship("Skill", back_populates="profile")
-    experiences = relationship("Experience", back_populates="profile")
-    projects = relationship("Project", back_populates="profile")
+    # child dihapus oleh database (ON DELETE CASCADE), tidak dimuat ke session saat delete
+    skills = relationship("Skill", back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
+    experiences = relationship("Experience", back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
+    projects = relationship("Project", back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
     # user = relationship("User")
 
 class UserLogin(Base):
@@ -32,7 +35,7 @@ class Skill(Base):
     __tablename__ = "skills"
 
     id = Column(Integer, primary_key=True, index=True)
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"), index=True)
     category = Column(String, nullable=False)
     skill = Column(String, nullable=False)
 
@@ -42,7 +45,7 @@ class Experience(Base):
     __tablename__ = "experiences"
 
     id = Column(Integer, primary_key=True, index=True)
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"), index=True)
     company = Column(String, nullable=False)
     position = Column(String, nullable=False)
     start_date = Column(Date, nullable=False)
@@ -55,9 +58,28 @@ class Project(Base):
     __tablename__ = "projects"
 
     id = Column(Integer, primary_key=True, index=True)
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"), index=True)
     name = Column(String, nullable=False)
     description = Column(String, nullable=False)
     link = Column(String, nullable=True)
 
-    profile = relationship("Profile", back_populates="projects")
\ No newline at end of file
+    profile = relationship("Profile", back_populates="projects")
+
+class SiteState(Base):
+    """Single row (id=1) holding precomputed pointers, e.g. the profile shown on /portofolio/"""
+    __tablename__ = "site_state"
+
+    id = Column(Integer, primary_key=True)
+    default_profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="SET NULL"), nullable=True)
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, server_default="pending", index=True)
+    attempts = Column(Integer, nullable=False, server_default="0")
+    last_error = Column(String, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
\ No newline at end of file
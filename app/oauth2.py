@@ -6,6 +6,7 @@ from . import  schemas, database, models
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from .config import settings
+from .accesslog import phase
 
 
 # openssl rand -hex 32
@@ -28,7 +29,8 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
 
 def verify_access_token(token: str, credentials_exception):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with phase("auth"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         id: str = payload.get("user_id")
         if id is None:
             raise credentials_exception
@@ -0,0 +1,259 @@
+"""Static snapshot of the public pages.
+
+Renders ``index.html`` and ``portfolio.html`` from the current database into
+``PRERENDER_DIR`` (default ``app/prerendered``) with content-hashed assets::
+
+    prerendered/
+        index.html
+        portofolio/index.html
+        assets/public.min.<hash>.css
+        static/uploads/...      (images referenced by the profile)
+        manifest.json
+
+The directory can be deployed to any static host as is. The app serves the
+snapshot for ``/`` and ``/portofolio/`` while it is fresh; any commit touching
+profile data marks it stale (live rendering takes over) and queues a rebuild,
+unless one is already queued: a burst of edits shares one build. Build it by hand with::
+
+    python -m app.prerender [--output DIR]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from . import models, jobs, assets as stylesheets
+from .config import settings
+from .database import Sessionlocal
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = Path(__file__).resolve().parent
+STATIC_DIR = APP_DIR / "static"
+TEMPLATES_DIR = APP_DIR / "templates"
+OUTPUT_DIR = Path(settings.prerender_dir) if settings.prerender_dir else APP_DIR / "prerendered"
+
+ASSETS = ["dist/public.min.css"]
+PAGES = {
+    "index.html": "index.html",
+    "portofolio/index.html": "portfolio.html",
+}
+WATCHED_MODELS = (models.Profile, models.Skill, models.Experience, models.Project)
+
+STALE_MARKER = "STALE"
+MANIFEST = "manifest.json"
+
+
+def page_path(page: str, output_dir: Path = OUTPUT_DIR) -> Path | None:
+    """Return the snapshot file for a page if the snapshot is fresh."""
+    if not settings.prerender_enabled:
+        return None
+    if (output_dir / STALE_MARKER).exists() or not (output_dir / MANIFEST).exists():
+        return None
+    path = output_dir / page
+    return path if path.exists() else None
+
+
+_manifest_cache: tuple[int, dict] | None = None
+
+
+def _fresh_manifest(output_dir: Path = OUTPUT_DIR) -> dict | None:
+    global _manifest_cache
+    if page_path(MANIFEST, output_dir) is None:
+        return None
+    mtime = (output_dir / MANIFEST).stat().st_mtime_ns
+    if _manifest_cache is None or _manifest_cache[0] != mtime:
+        _manifest_cache = (mtime, json.loads((output_dir / MANIFEST).read_text()))
+    return _manifest_cache[1]
+
+
+def preload_links(page: str, output_dir: Path = OUTPUT_DIR) -> list[str] | None:
+    """``Link`` header values recorded for a snapshot page, if the snapshot is fresh."""
+    manifest = _fresh_manifest(output_dir)
+    if manifest is None:
+        return None
+    return manifest.get("preload", {}).get(page)
+
+
+def mark_stale(output_dir: Path = OUTPUT_DIR):
+    if not (output_dir / MANIFEST).exists():
+        return
+    # token baru tiap edit, supaya build yang sedang berjalan tidak menghapus marker edit berikutnya
+    _write_atomic(output_dir / STALE_MARKER, uuid4().hex.encode())
+
+
+def source_fingerprint() -> str:
+    """Hash of the templates and assets the snapshot is built from."""
+    digest = hashlib.sha256()
+    # bundle CSS diturunkan dari styles.css dan template-nya (app/assets.py)
+    for path in [TEMPLATES_DIR / t for t in sorted(set(PAGES.values()))] + [stylesheets.SOURCE]:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _write_atomic(path: Path, content: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def _hash_assets(output_dir: Path) -> dict[str, str]:
+    stylesheets.ensure_built()
+    urls = {}
+    for name in ASSETS:
+        content = (STATIC_DIR / name).read_bytes()
+        stem, suffix = os.path.splitext(os.path.basename(name))
+        hashed = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{suffix}"
+        target = output_dir / "assets" / hashed
+        if not target.exists():
+            _write_atomic(target, content)
+        urls[name] = f"/assets/{hashed}"
+    return urls
+
+
+def build(output_dir: Path = OUTPUT_DIR) -> dict:
+    """Render the public pages from the database into ``output_dir``."""
+    from . import hints
+    from .routers.portofolio import portfolio_context
+    from .templating import templates
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    marker = output_dir / STALE_MARKER
+    token = marker.read_bytes() if marker.exists() else None
+
+    assets = _hash_assets(output_dir)
+
+    def static_url_for(name: str, **path_params) -> str:
+        if name != "static":
+            raise ValueError(f"Route {name!r} tidak tersedia di snapshot statis")
+        path = path_params["path"]
+        return assets.get(path, f"/static/{path}")
+
+    with Sessionlocal() as db:
+        contexts = {
+            "index.html": {},
+            "portfolio.html": portfolio_context(db),
+        }
+        env = templates.env
+        for page, template in PAGES.items():
+            html = env.get_template(template).render(
+                **contexts[template], request=None, url_for=static_url_for
+            )
+            _write_atomic(output_dir / page, html.encode("utf-8"))
+
+    # copy referenced uploads so the directory also works on a static host
+    profile = contexts["portfolio.html"]["profile"]
+    if profile and profile.image and profile.image.startswith("/static/uploads/"):
+        source = STATIC_DIR / "uploads" / Path(profile.image).name
+        target = output_dir / "static" / "uploads" / source.name
+        if source.exists() and not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+
+    image = profile.image if profile else None
+    manifest = {
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "source": source_fingerprint(),
+        "pages": sorted(PAGES),
+        "assets": assets,
+        "preload": {
+            "index.html": hints.page_links(assets["dist/public.min.css"], None),
+            "portofolio/index.html": hints.page_links(assets["dist/public.min.css"], image),
+        },
+    }
+    _write_atomic(output_dir / MANIFEST, json.dumps(manifest, indent=2).encode())
+
+    # hanya hapus marker kalau tidak ada edit baru selama build
+    current = marker.read_bytes() if marker.exists() else None
+    if current == token and current is not None:
+        marker.unlink(missing_ok=True)
+    return manifest
+
+
+def refresh_if_outdated(output_dir: Path = OUTPUT_DIR):
+    """Rebuild at startup when the snapshot is missing or built from other templates."""
+    if not settings.prerender_enabled:
+        return
+    manifest_path = output_dir / MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+        if manifest.get("source") != source_fingerprint() or (output_dir / STALE_MARKER).exists():
+            mark_stale(output_dir)
+            build(output_dir)
+    except Exception:
+        logger.exception("Prerender gagal, halaman publik dirender live")
+
+
+@jobs.task("prerender")
+def rebuild():
+    build()
+    if (OUTPUT_DIR / STALE_MARKER).exists():
+        # ada commit selama build; job-nya bisa saja digabung ke build ini, jadi build lagi
+        with Sessionlocal() as db:
+            _queue_rebuild(db)
+            db.commit()
+
+
+def _queue_rebuild(session: Session):
+    # cukup satu job prerender yang menunggu: build membaca data terbaru saat dijalankan
+    with session.no_autoflush:
+        queued = (
+            session.query(models.Job.id)
+            .filter(models.Job.name == "prerender", models.Job.status == "pending")
+            .first()
+        )
+    if queued is None:
+        jobs.enqueue(session, "prerender")
+
+
+def invalidate(session: Session):
+    """Queue a rebuild and mark the snapshot stale once ``session`` commits.
+
+    Called from the flush hook below, and directly by bulk SQL deletes that
+    never pass through a flush (see ``app/profiles.py``). A rollback drops both.
+    No job is added while another rebuild is still pending.
+    """
+    if not settings.prerender_enabled or session.info.get("prerender_queued"):
+        return
+    _queue_rebuild(session)
+    session.info["prerender_queued"] = True
+
+
+@event.listens_for(Session, "before_flush")
+def _invalidate_on_change(session, flush_context, instances):
+    changed = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(obj, WATCHED_MODELS) for obj in changed):
+        invalidate(session)
+
+
+# insert=True: marker harus ditulis sebelum job prerender di-dispatch (app/jobs.py), kalau
+# tidak build bisa membaca token lama dan marker dari commit ini tidak pernah terhapus
+@event.listens_for(Session, "after_commit", insert=True)
+def _mark_stale_after_commit(session):
+    if session.info.pop("prerender_queued", None):
+        mark_stale()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_flag(session):
+    session.info.pop("prerender_queued", None)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the public pages into a static directory")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args(argv)
+    manifest = build(args.output)
+    print(f"Snapshot written to {args.output} ({', '.join(manifest['pages'])})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Profile slugs, the default-profile pointer, profile versions and deletes.
+
+Every change to a profile or one of its skills, experiences or projects bumps
+``Profile.version`` in the same flush, so rendered pages are cached per
+``(profile id, version)`` (see ``app/routers/portofolio.py``): a page filled
+from stale data is never served for a newer version. Invalidating the
+``portfolio`` tag after commit only frees the entries of old versions.
+
+Deletes run as one ``DELETE`` per table; children of deleted profiles are
+removed by the database (``ON DELETE CASCADE``). Adding or editing a single
+skill, experience or project runs the ownership check, the write and the
+version bump as guarded statements sent in one round trip
+(``database.execute_pipeline``). Those statements bypass the flush hooks, so
+``mark_changed`` does their work explicitly.
+"""
+import re
+import unicodedata
+from collections.abc import Collection
+from sqlalchemy import delete, event, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from . import models, jobs, prerender
+from .database import execute_pipeline
+from .cache import cache
+
+CHILD_MODELS = (models.Skill, models.Experience, models.Project)
+
+# path lain di bawah /portofolio/ yang tidak boleh tertutup oleh slug
+RESERVED_SLUGS = {"all", "create", "update", "delete", "skill", "experience"}
+
+
+def slugify(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return slug or "profile"
+
+
+def unique_slug(db: Session, name: str) -> str:
+    base = slugify(name)
+    taken = {
+        row.slug
+        for row in db.query(models.Profile.slug).filter(
+            (models.Profile.slug == base) | models.Profile.slug.like(f"{base}-%")
+        )
+    }
+    slug, n = base, 1
+    while slug in taken or slug in RESERVED_SLUGS:
+        n += 1
+        slug = f"{base}-{n}"
+    return slug
+
+
+def ensure_profile_state(db: Session):
+    """Give profiles created before slugs existed one and initialise the default pointer."""
+    profiles = db.query(models.Profile).filter(models.Profile.slug.is_(None)).order_by(models.Profile.id).all()
+    for profile in profiles:
+        profile.slug = unique_slug(db, profile.name)
+        db.flush()
+    state = db.get(models.SiteState, 1)
+    if state is None or state.default_profile_id is None:
+        refresh_default_profile(db)
+    db.commit()
+
+
+def _site_state(db: Session) -> models.SiteState:
+    state = db.get(models.SiteState, 1)
+    if state is None:
+        state = models.SiteState(id=1)
+        db.add(state)
+    return state
+
+
+def set_default_profile(db: Session, profile_id: int | None):
+    _site_state(db).default_profile_id = profile_id
+
+
+def refresh_default_profile(db: Session, exclude_ids: Collection[int] = ()):
+    """Point the default at the newest profile; only needed when the current one goes away."""
+    query = db.query(models.Profile.id)
+    if exclude_ids:
+        query = query.filter(models.Profile.id.not_in(exclude_ids))
+    newest = query.order_by(models.Profile.created_at.desc(), models.Profile.id.desc()).first()
+    set_default_profile(db, newest.id if newest else None)
+
+
+def default_profile_key(db: Session):
+    """Return ``(id, version)`` of the profile shown on /portofolio/, or None."""
+    row = (
+        db.query(models.Profile.id, models.Profile.version)
+        .join(models.SiteState, models.SiteState.default_profile_id == models.Profile.id)
+        .filter(models.SiteState.id == 1)
+        .first()
+    )
+    if row is None:
+        # pointer belum diinisialisasi (lihat ensure_profile_state), fallback ke sort
+        row = (
+            db.query(models.Profile.id, models.Profile.version)
+            .order_by(models.Profile.created_at.desc(), models.Profile.id.desc())
+            .first()
+        )
+    return row
+
+
+def profile_key_by_slug(db: Session, slug: str):
+    return db.query(models.Profile.id, models.Profile.version).filter(models.Profile.slug == slug).first()
+
+
+def all_profiles_key(db: Session) -> str:
+    """Fingerprint of all profiles, the cache key of ``/portofolio/all``.
+
+    Edits raise a version, deletes lower the count and new profiles raise the
+    highest id and creation time, so every committed change gives a new key.
+    """
+    row = db.query(
+        func.count(models.Profile.id),
+        func.max(models.Profile.id),
+        func.max(models.Profile.created_at),
+        func.coalesce(func.sum(models.Profile.version), 0),
+    ).one()
+    return ":".join(str(value) for value in row)
+
+
+def mark_changed(db: Session, profile_ids: Collection[int] = ()):
+    """Do what the flush hooks do for changes made with bulk SQL.
+
+    Bumps the version of ``profile_ids`` now and invalidates the page cache and
+    the static snapshot once ``db`` commits.
+    """
+    if profile_ids:
+        db.execute(
+            update(models.Profile.__table__)
+            .where(models.Profile.__table__.c.id.in_(profile_ids))
+            .values(version=models.Profile.__table__.c.version + 1)
+        )
+    db.info["profiles_changed"] = True
+    prerender.invalidate(db)
+
+
+def delete_profiles(db: Session, ids: Collection[int], owner_id: int) -> list[int]:
+    """Delete the profiles of ``owner_id`` among ``ids``; returns the deleted ids.
+
+    Skills, experiences and projects go with them through the database cascade,
+    uploaded photos are removed by a background job after commit.
+    """
+    if not ids:
+        return []
+    rows = db.execute(
+        delete(models.Profile)
+        .where(models.Profile.id.in_(ids), models.Profile.userInput == owner_id)
+        .returning(models.Profile.id, models.Profile.image)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not rows:
+        return []
+    # pointer ke profile yang terhapus sudah di-SET NULL oleh database
+    refresh_default_profile(db)
+    for row in rows:
+        if row.image:
+            jobs.enqueue(db, "delete_upload", path=row.image)
+    mark_changed(db)
+    return [row.id for row in rows]
+
+
+def delete_children(db: Session, model, ids: Collection[int], profile_id: int) -> int:
+    """Delete skills/experiences/projects of one profile in one statement; returns the row count."""
+    if not ids:
+        return 0
+    result = db.execute(
+        delete(model)
+        .where(model.id.in_(ids), model.profile_id == profile_id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        mark_changed(db, [profile_id])
+    return result.rowcount
+
+
+def _owned(profile_id: int, owner_id: int):
+    return select(models.Profile.id).where(models.Profile.id == profile_id, models.Profile.userInput == owner_id)
+
+
+def _bump_owned(profile_id: int, owner_id: int):
+    # sekaligus pengecekan pemilik: tidak ada baris yang kembali kalau profile bukan milik owner_id
+    table = models.Profile.__table__
+    return (
+        update(table)
+        .where(table.c.id == profile_id, table.c.userInput == owner_id)
+        .values(version=table.c.version + 1)
+        .returning(table.c.id)
+    )
+
+
+def add_child(db: Session, model, profile_id: int, owner_id: int, values: dict) -> int | None:
+    """Add a skill/experience/project to a profile of ``owner_id``; returns its id.
+
+    Returns None (and writes nothing) when the profile does not exist or
+    belongs to someone else.
+    """
+    columns = {"profile_id": profile_id, **values}
+    row = select(*(literal(value, model.__table__.c[name].type) for name, value in columns.items()))
+    bumped, inserted = execute_pipeline(
+        db,
+        _bump_owned(profile_id, owner_id),
+        insert(model)
+        .from_select(list(columns), row.where(_owned(profile_id, owner_id).exists()))
+        .returning(model.id),
+    )
+    if not bumped:
+        return None
+    mark_changed(db)
+    return inserted[0].id
+
+
+def update_child(db: Session, model, child_id: int, profile_id: int, owner_id: int, values: dict) -> tuple[bool, bool]:
+    """Update a skill/experience/project of a profile of ``owner_id``.
+
+    Returns ``(profile found, child found)``; the caller must not commit unless
+    both are true (the version bump is already pending).
+    """
+    bumped, updated = execute_pipeline(
+        db,
+        _bump_owned(profile_id, owner_id),
+        update(model)
+        .where(model.id == child_id, model.profile_id == profile_id, _owned(profile_id, owner_id).exists())
+        .values(**values)
+        .returning(model.id),
+    )
+    if bumped and updated:
+        mark_changed(db)
+    return bool(bumped), bool(updated)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_versions(session, flush_context, instances):
+    touched = session.info.setdefault("touched_profiles", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, models.Profile):
+            session.info["profiles_changed"] = True
+            if obj not in session.new and obj not in session.deleted and session.is_modified(obj):
+                obj.version = models.Profile.version + 1
+        elif isinstance(obj, CHILD_MODELS) and obj.profile_id is not None:
+            session.info["profiles_changed"] = True
+            touched.add(obj.profile_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_parent_versions(session, flush_context):
+    touched = session.info.pop("touched_profiles", None)
+    if touched:
+        session.connection().execute(
+            update(models.Profile.__table__)
+            .where(models.Profile.__table__.c.id.in_(touched))
+            .values(version=models.Profile.__table__.c.version + 1)
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cache(session):
+    # setelah commit, supaya worker lain tidak langsung mengisi cache dengan data lama
+    if session.info.pop("profiles_changed", False):
+        cache.invalidate("portfolio")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("profiles_changed", None)
+    session.info.pop("touched_profiles", None)
@@ -0,0 +1,155 @@
+"""Rate limiting and concurrency guard for the auth endpoints.
+
+Login and user creation run an Argon2 hash plus a DB lookup, so they are
+throttled per client IP and per email with a sliding-window counter before any
+of that work starts. The counters live in process memory by default; set
+``RATE_LIMIT_BACKEND=redis`` and ``RATE_LIMIT_REDIS_URL`` to share them between
+workers (needs the ``redis`` package).
+"""
+import math
+import time
+from fastapi import HTTPException, Request, status
+from .config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional, only needed for the shared backend
+    aioredis = None
+
+
+class InMemoryBackend:
+    """Sliding-window counters in a dict, local to this process."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._windows: dict[str, tuple[int, int, int]] = {}
+
+    async def hit(self, key: str, window: int, now: float) -> float:
+        """Count one hit and return the estimated number of hits in the last window."""
+        current = int(now // window)
+        start, previous, count = self._windows.get(key, (current, 0, 0))
+        if start != current:
+            previous = count if start == current - 1 else 0
+            start, count = current, 0
+        count += 1
+        self._windows[key] = (start, previous, count)
+        if len(self._windows) > self.max_keys:
+            self._prune(current)
+        return _estimate(previous, count, now, window)
+
+    def _prune(self, current: int):
+        self._windows = {k: v for k, v in self._windows.items() if v[0] >= current - 1}
+
+    def reset(self):
+        self._windows.clear()
+
+
+class RedisBackend:
+    """Sliding-window counters in Redis, shared by all workers."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit"):
+        if aioredis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis membutuhkan package redis")
+        self.client = aioredis.from_url(url)
+        self.prefix = prefix
+
+    async def hit(self, key: str, window: int, now: float) -> float:
+        current = int(now // window)
+        current_key = f"{self.prefix}:{key}:{current}"
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, window * 2)
+            pipe.get(f"{self.prefix}:{key}:{current - 1}")
+            count, _, previous = await pipe.execute()
+        return _estimate(int(previous or 0), int(count), now, window)
+
+    async def reset(self):
+        async for key in self.client.scan_iter(f"{self.prefix}:*"):
+            await self.client.delete(key)
+
+
+def _estimate(previous: int, count: int, now: float, window: int) -> float:
+    elapsed = (now % window) / window
+    return previous * (1 - elapsed) + count
+
+
+def _create_backend():
+    if settings.rate_limit_backend == "redis":
+        return RedisBackend(settings.rate_limit_redis_url)
+    return InMemoryBackend()
+
+
+backend = _create_backend()
+
+
+def client_ip(request: Request) -> str:
+    # X-Forwarded-For sudah di-resolve uvicorn (proxy_headers + forwarded_allow_ips), hanya dari
+    # proxy yang dipercaya; header tidak dibaca sendiri karena entri paling kiri diisi client
+    return request.client.host if request.client else "unknown"
+
+
+def _too_many_requests(now: float) -> HTTPException:
+    window = settings.rate_limit_window_seconds
+    retry_after = max(1, math.ceil(window - now % window))
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Terlalu banyak percobaan, coba lagi nanti",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+async def _email_from_body(request: Request, field: str) -> str | None:
+    # Starlette menyimpan hasil parse body di Request, jadi endpoint tidak membaca ulang
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        value = body.get(field) if isinstance(body, dict) else None
+    else:
+        value = (await request.form()).get(field)
+    return value.strip().lower() if isinstance(value, str) and value else None
+
+
+def rate_limit(scope: str, email_field: str | None = None):
+    """Dependency that answers 429 once a client IP or email exceeds the limit.
+
+    ``email_field`` is the name of the body field holding the email
+    (``username`` for the OAuth2 form, ``email`` for the admin form and JSON body).
+    """
+    async def dependency(request: Request):
+        window = settings.rate_limit_window_seconds
+        now = time.time()
+        if await backend.hit(f"{scope}:ip:{client_ip(request)}", window, now) > settings.rate_limit_per_ip:
+            raise _too_many_requests(now)
+
+        if email_field:
+            email = await _email_from_body(request, email_field)
+            if email and await backend.hit(f"{scope}:email:{email}", window, now) > settings.rate_limit_per_email:
+                raise _too_many_requests(now)
+
+    return dependency
+
+
+class ConcurrencyGuard:
+    """Reject instead of queueing once too many password hashes are in flight."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+
+    async def __call__(self):
+        if self.active >= self.limit:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Server sedang sibuk, coba lagi nanti",
+                headers={"Retry-After": "1"},
+            )
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+
+
+hash_guard = ConcurrencyGuard(settings.auth_max_concurrent_hashes)
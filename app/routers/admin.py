@@ -1,14 +1,15 @@
 from pathlib import Path
+import asyncio
 import shutil
 from uuid import uuid4
-from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, UploadFile, File, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session, selectinload
-from .. import models, utils, oauth2
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from .. import models, utils, oauth2, ratelimit, jobs, profiles, accesslog
 from ..database import get_db
+from ..templating import templates
 
-templates = Jinja2Templates(directory=str(Path(__file__).resolve().parent.parent / "templates"))
 
 router = APIRouter(
     prefix="/admin",
@@ -49,13 +50,21 @@ async def save_uploaded_file(file: UploadFile) -> str:
     filename = f"{uuid4().hex}{ext}"
     file_path = UPLOAD_DIR / filename
     
-    # Save file
-    with file_path.open("wb") as f:
-        f.write(contents)
+    # Save file tanpa memblokir event loop
+    with accesslog.phase("io"):
+        await asyncio.to_thread(file_path.write_bytes, contents)
     
     # Return relative path for URL
     return f"/static/uploads/{filename}"
 
+# Background job: hapus file upload lama setelah perubahan di-commit
+@jobs.task("delete_upload")
+def delete_upload(path: str):
+    """Delete a file previously stored by save_uploaded_file"""
+    if not path or not path.startswith("/static/uploads/"):
+        return
+    (UPLOAD_DIR / Path(path).name).unlink(missing_ok=True)
+
 # Dependency untuk autentikasi admin
 def get_admin_user(request: Request, db: Session = Depends(get_db)):
     token = request.cookies.get("admin_token")
@@ -80,7 +89,11 @@ def get_admin_user(request: Request, db: Session = Depends(get_db)):
 async def admin_login_page(request: Request):
     return templates.TemplateResponse("login.html", {"request": request})
 
-@router.post("/login", response_class=HTMLResponse)
+@router.post(
+    "/login",
+    response_class=HTMLResponse,
+    dependencies=[Depends(ratelimit.rate_limit("login", "email")), Depends(ratelimit.hash_guard)],
+)
 async def admin_login(request: Request, db: Session = Depends(get_db)):
     form_data = await request.form()
     email = form_data.get("email")
@@ -100,19 +113,72 @@ async def admin_login(request: Request, db: Session = Depends(get_db)):
     return response
 
 # Admin Dashboard Routes
+DASHBOARD_SORT_COLUMNS = {
+    "name": models.Profile.name,
+    "age": models.Profile.age,
+    "education": models.Profile.education,
+    "university": models.Profile.university,
+    "created_at": models.Profile.created_at,
+}
+
+def _child_count(model):
+    return (
+        select(func.count(model.id))
+        .where(model.profile_id == models.Profile.id)
+        .correlate(models.Profile)
+        .scalar_subquery()
+    )
+
 @router.get("/dashboard", response_class=HTMLResponse)
-async def admin_dashboard(request: Request, db: Session = Depends(get_db), current_user = Depends(get_admin_user)):
+async def admin_dashboard(
+    request: Request,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    sort: str = "created_at",
+    order: str = "desc",
+    db: Session = Depends(get_db),
+    current_user = Depends(get_admin_user)
+):
+    # Hanya kolom yang ditampilkan + jumlah child via COUNT subquery, bukan seluruh relasi
+    if sort not in DASHBOARD_SORT_COLUMNS:
+        sort = "created_at"
+    if order not in ("asc", "desc"):
+        order = "desc"
+    sort_column = DASHBOARD_SORT_COLUMNS[sort]
+    sort_column = sort_column.desc() if order == "desc" else sort_column.asc()
+
+    total = db.query(func.count(models.Profile.id)).filter(models.Profile.userInput == current_user.id).scalar()
+    pages = max(1, -(-total // per_page))
+    page = min(page, pages)
+
     profiles = (
-        db.query(models.Profile)
-        .filter(models.Profile.userInput == current_user.id)
-        .options(
-            selectinload(models.Profile.skills),
-            selectinload(models.Profile.experiences),
-            selectinload(models.Profile.projects),
+        db.query(
+            models.Profile.id,
+            models.Profile.name,
+            models.Profile.age,
+            models.Profile.education,
+            models.Profile.university,
+            models.Profile.slug,
+            _child_count(models.Skill).label("skill_count"),
+            _child_count(models.Experience).label("experience_count"),
+            _child_count(models.Project).label("project_count"),
         )
+        .filter(models.Profile.userInput == current_user.id)
+        .order_by(sort_column, models.Profile.id)
+        .offset((page - 1) * per_page)
+        .limit(per_page)
         .all()
     )
-    return templates.TemplateResponse("admin.html", {"request": request, "profiles": profiles})
+    return templates.TemplateResponse("admin.html", {
+        "request": request,
+        "profiles": profiles,
+        "total": total,
+        "page": page,
+        "pages": pages,
+        "per_page": per_page,
+        "sort": sort,
+        "order": order,
+    })
 
 @router.get("/profile/create", response_class=HTMLResponse)
 async def create_profile_page(request: Request, db: Session = Depends(get_db), current_user = Depends(get_admin_user)):
@@ -142,9 +208,12 @@ async def create_profile_submit(
         university=university,
         biography=biography,
         image=image_path,
-        userInput=current_user.id
+        userInput=current_user.id,
+        slug=profiles.unique_slug(db, name),
     )
     db.add(new_profile)
+    db.flush()
+    profiles.set_default_profile(db, new_profile.id)
     db.commit()
     
     return RedirectResponse(url="/admin/dashboard", status_code=303)
@@ -176,11 +245,9 @@ async def edit_profile_submit(
     
     # Handle file upload
     if image and image.filename:
-        # Delete old image if exists
-        if profile.image and profile.image.startswith("/static/uploads/"):
-            old_file = Path(__file__).resolve().parent.parent / profile.image.lstrip("/")
-            if old_file.exists():
-                old_file.unlink(missing_ok=True)
+        # Old image is deleted in the background once the new path is committed
+        if profile.image:
+            jobs.enqueue(db, "delete_upload", path=profile.image)
         
         profile.image = await save_uploaded_file(image)
     
@@ -193,13 +260,17 @@ async def edit_profile_submit(
     db.commit()
     return RedirectResponse(url="/admin/dashboard", status_code=303)
 
+# Delete dijalankan sebagai satu DELETE per tabel, child ikut terhapus lewat ON DELETE CASCADE
+@router.post("/profile/delete", response_class=HTMLResponse)
+async def delete_profiles_submit(request: Request, ids: list[int] = Form([]), db: Session = Depends(get_db), current_user = Depends(get_admin_user)):
+    profiles.delete_profiles(db, ids, current_user.id)
+    db.commit()
+    return RedirectResponse(url="/admin/dashboard", status_code=303)
+
 @router.post("/profile/{profile_id}/delete", response_class=HTMLResponse)
 async def delete_profile_submit(profile_id: int, request: Request, db: Session = Depends(get_db), current_user = Depends(get_admin_user)):
-    profile = db.query(models.Profile).filter(models.Profile.id == profile_id).first()
-    if not profile or profile.userInput != current_user.id:
+    if not profiles.delete_profiles(db, [profile_id], current_user.id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-    
-    db.delete(profile)
     db.commit()
     return RedirectResponse(url="/admin/dashboard", status_code=303)
 
@@ -230,16 +301,9 @@ async def create_skill_submit(
     db: Session = Depends(get_db),
     current_user = Depends(get_admin_user)
 ):
-    profile = db.query(models.Profile).filter(models.Profile.id == profile_id).first()
-    if not profile or profile.userInput != current_user.id:
+    values = {"category": category, "skill": skill}
+    if profiles.add_child(db, models.Skill, profile_id, current_user.id, values) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-    
-    new_skill = models.Skill(
-        profile_id=profile_id,
-        category=category,
-        skill=skill
-    )
-    db.add(new_skill)
     db.commit()
     
     return RedirectResponse(url=f"/admin/profile/{profile_id}/skills", status_code=303)
@@ -266,17 +330,22 @@ async def edit_skill_submit(
     db: Session = Depends(get_db),
     current_user = Depends(get_admin_user)
 ):
+    values = {"category": category, "skill": skill}
+    found, updated = profiles.update_child(db, models.Skill, skill_id, profile_id, current_user.id, values)
+    if not found:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if not updated:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
+    db.commit()
+    return RedirectResponse(url=f"/admin/profile/{profile_id}/skills", status_code=303)
+
+@router.post("/profile/{profile_id}/skills/delete", response_class=HTMLResponse)
+async def delete_skills_submit(profile_id: int, request: Request, ids: list[int] = Form([]), db: Session = Depends(get_db), current_user = Depends(get_admin_user)):
     profile = db.query(models.Profile).filter(models.Profile.id == profile_id).first()
     if not profile or profile.userInput != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-    
-    skill_obj = db.query(models.Skill).filter(models.Skill.id == skill_id, models.Skill.profile_id == profile_id).first()
-    if not skill_obj:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
-    
-    skill_obj.category = category
-    skill_obj.skill = skill
-    
+
+    profiles.delete_children(db, models.Skill, ids, profile_id)
     db.commit()
     return RedirectResponse(url=f"/admin/profile/{profile_id}/skills", status_code=303)
 
@@ -286,11 +355,8 @@ async def delete_skill_submit(profile_id: int, skill_id: int, request: Request,
     if not profile or profile.userInput != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
     
-    skill = db.query(models.Skill).filter(models.Skill.id == skill_id, models.Skill.profile_id == profile_id).first()
-    if not skill:
+    if not profiles.delete_children(db, models.Skill, [skill_id], profile_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Skill not found")
-    
-    db.delete(skill)
     db.commit()
     return RedirectResponse(url=f"/admin/profile/{profile_id}/skills", status_code=303)
 
@@ -325,17 +391,9 @@ async def create_project_submit(
     db: Session = Depends(get_db),
     current_user=Depends(get_admin_user),
 ):
-    profile = db.query(models.Profile).filter(models.Profile.id == profile_id).first()
-    if not profile or profile.userInput != current_user.id:
+    values = {"name": name, "description": description, "link": link or None}
+    if profiles.add_child(db, models.Project, profile_id, current_user.id, values) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-
-    new_project = models.Project(
-        profile_id=profile_id,
-        name=name,
-        description=description,
-        link=link or None,
-    )
-    db.add(new_project)
     db.commit()
 
     return RedirectResponse(url=f"/admin/profile/{profile_id}/projects", status_code=303)
@@ -365,33 +423,34 @@ async def edit_project_submit(
     db: Session = Depends(get_db),
     current_user=Depends(get_admin_user),
 ):
-    profile = db.query(models.Profile).filter(models.Profile.id == profile_id).first()
-    if not profile or profile.userInput != current_user.id:
+    values = {"name": name, "description": description, "link": link or None}
+    found, updated = profiles.update_child(db, models.Project, project_id, profile_id, current_user.id, values)
+    if not found:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-
-    project = db.query(models.Project).filter(models.Project.id == project_id, models.Project.profile_id == profile_id).first()
-    if not project:
+    if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    db.commit()
+    return RedirectResponse(url=f"/admin/profile/{profile_id}/projects", status_code=303)
 
-    project.name = name
-    project.description = description
-    project.link = link or None
 
+@router.post("/profile/{profile_id}/projects/delete", response_class=HTMLResponse)
+async def delete_projects_submit(profile_id: int, request: Request, ids: list[int] = Form([]), db: Session = Depends(get_db), current_user=Depends(get_admin_user)):
+    profile = db.query(models.Profile).filter(models.Profile.id == profile_id).first()
+    if not profile or profile.userInput != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    profiles.delete_children(db, models.Project, ids, profile_id)
     db.commit()
     return RedirectResponse(url=f"/admin/profile/{profile_id}/projects", status_code=303)
 
-
 @router.post("/profile/{profile_id}/projects/{project_id}/delete", response_class=HTMLResponse)
 async def delete_project_submit(profile_id: int, project_id: int, request: Request, db: Session = Depends(get_db), current_user=Depends(get_admin_user)):
     profile = db.query(models.Profile).filter(models.Profile.id == profile_id).first()
     if not profile or profile.userInput != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
 
-    project = db.query(models.Project).filter(models.Project.id == project_id, models.Project.profile_id == profile_id).first()
-    if not project:
+    if not profiles.delete_children(db, models.Project, [project_id], profile_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-
-    db.delete(project)
     db.commit()
     return RedirectResponse(url=f"/admin/profile/{profile_id}/projects", status_code=303)
 
@@ -426,24 +485,21 @@ async def create_experience_submit(
     db: Session = Depends(get_db),
     current_user = Depends(get_admin_user)
 ):
-    profile = db.query(models.Profile).filter(models.Profile.id == profile_id).first()
-    if not profile or profile.userInput != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-    
     # Parse dates
     from datetime import datetime
     start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
     end_date_obj = None if is_current or not end_date else datetime.strptime(end_date, '%Y-%m-%d').date()
     
-    new_experience = models.Experience(
-        profile_id=profile_id,
-        company=company,
-        position=position,
-        start_date=start_date_obj,
-        end_date=end_date_obj,
-        description=description
-    )
-    db.add(new_experience)
+    values = {
+        "company": company,
+        "position": position,
+        "start_date": start_date_obj,
+        "end_date": end_date_obj,
+        "description": description,
+    }
+    # cek pemilik, insert dan bump versi dikirim dalam satu round trip
+    if profiles.add_child(db, models.Experience, profile_id, current_user.id, values) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
     db.commit()
     
     return RedirectResponse(url=f"/admin/profile/{profile_id}/experiences", status_code=303)
@@ -474,25 +530,33 @@ async def edit_experience_submit(
     db: Session = Depends(get_db),
     current_user = Depends(get_admin_user)
 ):
-    profile = db.query(models.Profile).filter(models.Profile.id == profile_id).first()
-    if not profile or profile.userInput != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-    
-    experience = db.query(models.Experience).filter(models.Experience.id == exp_id, models.Experience.profile_id == profile_id).first()
-    if not experience:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Experience not found")
-    
     # Parse dates
     from datetime import datetime
     start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
     end_date_obj = None if is_current or not end_date else datetime.strptime(end_date, '%Y-%m-%d').date()
     
-    experience.company = company
-    experience.position = position
-    experience.start_date = start_date_obj
-    experience.end_date = end_date_obj
-    experience.description = description
-    
+    values = {
+        "company": company,
+        "position": position,
+        "start_date": start_date_obj,
+        "end_date": end_date_obj,
+        "description": description,
+    }
+    found, updated = profiles.update_child(db, models.Experience, exp_id, profile_id, current_user.id, values)
+    if not found:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if not updated:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Experience not found")
+    db.commit()
+    return RedirectResponse(url=f"/admin/profile/{profile_id}/experiences", status_code=303)
+
+@router.post("/profile/{profile_id}/experiences/delete", response_class=HTMLResponse)
+async def delete_experiences_submit(profile_id: int, request: Request, ids: list[int] = Form([]), db: Session = Depends(get_db), current_user = Depends(get_admin_user)):
+    profile = db.query(models.Profile).filter(models.Profile.id == profile_id).first()
+    if not profile or profile.userInput != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    profiles.delete_children(db, models.Experience, ids, profile_id)
     db.commit()
     return RedirectResponse(url=f"/admin/profile/{profile_id}/experiences", status_code=303)
 
@@ -502,10 +566,7 @@ async def delete_experience_submit(profile_id: int, exp_id: int, request: Reques
     if not profile or profile.userInput != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
     
-    experience = db.query(models.Experience).filter(models.Experience.id == exp_id, models.Experience.profile_id == profile_id).first()
-    if not experience:
+    if not profiles.delete_children(db, models.Experience, [exp_id], profile_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Experience not found")
-    
-    db.delete(experience)
     db.commit()
     return RedirectResponse(url=f"/admin/profile/{profile_id}/experiences", status_code=303)
@@ -1,7 +1,7 @@
 #router to create authentication endpoints, seperti login, register, dll
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from .. import models, schemas, utils, oauth2
+from .. import models, schemas, utils, oauth2, ratelimit
 from ..database import get_db
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
@@ -13,7 +13,12 @@ router = APIRouter(
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 # endpoint untuk create user baru
-@router.post("/create", status_code=status.HTTP_201_CREATED, response_model=schemas.UserResponse)
+@router.post(
+    "/create",
+    status_code=status.HTTP_201_CREATED,
+    response_model=schemas.UserResponse,
+    dependencies=[Depends(ratelimit.rate_limit("create-user", "email")), Depends(ratelimit.hash_guard)],
+)
 def create_user(new_user: schemas.CreateUser, db: Session = Depends(get_db)):
     # check if email already exists
     user = db.query(models.UserLogin).filter(models.UserLogin.email == new_user.email).first()
@@ -33,7 +38,11 @@ def create_user(new_user: schemas.CreateUser, db: Session = Depends(get_db)):
     return new_user
 
 #endpoint untuk login user
-@router.post("/login", response_model=schemas.token)
+@router.post(
+    "/login",
+    response_model=schemas.token,
+    dependencies=[Depends(ratelimit.rate_limit("login", "username")), Depends(ratelimit.hash_guard)],
+)
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = db.query(models.UserLogin).filter(models.UserLogin.email == form_data.username).first()
     if not user:
@@ -0,0 +1,84 @@
+#router untuk health check load balancer / Render, tanpa render template
+import asyncio
+import tempfile
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from .. import database
+from ..config import settings
+from .admin import UPLOAD_DIR
+
+router = APIRouter(tags=["Health"])
+
+# satu pengecekan database pada satu waktu; probe yang datang bersamaan menunggu hasil yang sama
+_db_check: asyncio.Task | None = None
+
+
+def pool_status(engine, max_overflow: int = settings.database_max_overflow) -> dict:
+    pool = engine.pool
+    stats = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            stats[name] = method()
+    if "size" in stats and "checkedout" in stats:
+        # max_overflow negatif (tanpa batas) tidak menambah kapasitas yang bisa dihitung
+        capacity = stats["size"] + max(max_overflow, 0)
+        stats["utilization"] = round(stats["checkedout"] / capacity, 2) if capacity else None
+    return stats
+
+
+def _ping_database():
+    with database.engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def _check_upload_dir():
+    with tempfile.TemporaryFile(dir=UPLOAD_DIR):
+        pass
+
+
+async def _check_database():
+    global _db_check
+    if _db_check is None or _db_check.done():
+        _db_check = asyncio.create_task(asyncio.to_thread(_ping_database))
+        # error dari pengecekan yang selesai setelah timeout tidak perlu dilaporkan asyncio
+        _db_check.add_done_callback(lambda task: task.cancelled() or task.exception())
+    # shield: timeout pada satu probe tidak membatalkan pengecekan yang ditunggu probe lain
+    await asyncio.shield(_db_check)
+
+
+async def _run_check(check) -> str:
+    try:
+        await asyncio.wait_for(check(), timeout=settings.health_check_timeout_seconds)
+    except asyncio.TimeoutError:
+        return "timeout"
+    except Exception as exc:
+        return f"error: {type(exc).__name__}"
+    return "ok"
+
+
+# liveness: proses masih melayani request, tanpa I/O
+@router.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+# readiness: database dan direktori upload bisa dipakai, plus status connection pool
+@router.get("/readyz")
+async def readyz():
+    checks = {
+        "database": await _run_check(_check_database),
+        "uploads": await _run_check(lambda: asyncio.to_thread(_check_upload_dir)),
+    }
+    ready = all(result == "ok" for result in checks.values())
+    payload = {
+        "status": "ok" if ready else "unavailable",
+        "checks": checks,
+        "pool": {"primary": pool_status(database.engine)},
+    }
+    if database.replica_engine is not None:
+        # replica tidak menentukan readiness, route publik fallback ke primary
+        payload["pool"]["replica"] = pool_status(database.replica_engine)
+        payload["replica_available"] = database.replica_available()
+    return JSONResponse(payload, status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
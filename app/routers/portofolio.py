@@ -1,47 +1,88 @@
-from pathlib import Path
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import FileResponse, HTMLResponse, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
-from .. import models, schemas, utils, oauth2
-from ..database import get_db
+from .. import models, schemas, utils, oauth2, prerender, profiles, hints
+from ..cache import cache
+from ..database import get_db, get_read_db
+from ..templating import templates
 
 router = APIRouter(
     prefix="/portofolio",
     tags=['Portofolio']
 )
 
-templates = Jinja2Templates(directory=str(Path(__file__).resolve().parent.parent / "templates"))
-
-@router.get("/", response_class=HTMLResponse)
-def view_portofolio(request: Request, db: Session = Depends(get_db)):
-    profile = (
-        db.query(models.Profile)
-        .options(
-            selectinload(models.Profile.skills),
-            selectinload(models.Profile.experiences),
-            selectinload(models.Profile.projects),
+def portfolio_context(db: Session, profile_id: int | None = None) -> dict:
+    """Template context for portfolio.html, shared with the static snapshot (app/prerender.py)
+
+    Without profile_id the default profile (newest, see app/profiles.py) is used.
+    """
+    if profile_id is None:
+        key = profiles.default_profile_key(db)
+        profile_id = key.id if key else None
+
+    profile = None
+    if profile_id is not None:
+        profile = (
+            db.query(models.Profile)
+            .options(
+                selectinload(models.Profile.skills),
+                selectinload(models.Profile.experiences),
+                selectinload(models.Profile.projects),
+            )
+            .filter(models.Profile.id == profile_id)
+            .first()
         )
-        .order_by(models.Profile.created_at.desc())
-        .first()
-    )
     contact_email = "aavellino591@gmail.com"
 
     # Sort experiences if profile exists
     if profile and profile.experiences:
         profile.experiences.sort(key=lambda x: x.start_date, reverse=True)
-    
-
-    return templates.TemplateResponse(
-        "portfolio.html",
-        {
-            "request": request,
-            "profile": profile,
-            "contact_email": contact_email,
-            "github_url": "https://github.com/AndrewA30?tab=repositories",
-            "linkedin_url": "https://www.linkedin.com/in/andrew-avellino-99649a164/",
-        },
-    )
+
+    return {
+        "profile": profile,
+        "contact_email": contact_email,
+        "github_url": "https://github.com/AndrewA30?tab=repositories",
+        "linkedin_url": "https://www.linkedin.com/in/andrew-avellino-99649a164/",
+    }
+
+def _static_path(name: str, **path_params) -> str:
+    # path relatif, supaya HTML yang di-cache tidak terikat ke host request pertama
+    if name != "static":
+        raise ValueError(f"Route {name!r} tidak tersedia di halaman yang di-cache")
+    return f"/static/{path_params['path']}"
+
+def profile_cache_key(key) -> str:
+    # per (id, version): isi dari replica yang tertinggal hanya terbaca oleh request yang
+    # juga melihat versi lama, request sticky ke primary langsung memakai versi baru
+    return f"portfolio:profile:{key.id}:{key.version}"
+
+def render_profile_page(db: Session, key=None) -> bytes:
+    context = portfolio_context(db, key.id if key is not None else None)
+    if key is not None:
+        # URL foto untuk preload header request berikutnya (app/hints.py)
+        hints.remember_image(key, context["profile"].image if context["profile"] else None)
+    html = templates.env.get_template("portfolio.html").render(**context, request=None, url_for=_static_path)
+    return html.encode("utf-8")
+
+def cached_profile_page(request: Request, db: Session, key) -> HTMLResponse:
+    html = cache.get_or_set(profile_cache_key(key), lambda: render_profile_page(db, key), tags=("portfolio",))
+    if not getattr(request.state, "preload_image_known", True):
+        # halaman bisa berasal dari cache yang dirender untuk path lain (/portofolio/ vs slug)
+        hints.remember_path(request.url.path, key)
+    return HTMLResponse(html)
+
+@router.get("/", response_class=HTMLResponse)
+def view_portofolio(request: Request, db: Session = Depends(get_read_db)):
+    # Pakai snapshot statis selama masih fresh, render live kalau sudah stale
+    snapshot = prerender.page_path("portofolio/index.html")
+    if snapshot:
+        return FileResponse(snapshot, media_type="text/html")
+
+    key = profiles.default_profile_key(db)
+    if key is None:
+        return HTMLResponse(render_profile_page(db))
+    return cached_profile_page(request, db, key)
 
 # endpoint untuk mendapatkan semua portofolio beserta skillnya dengan cara looping.
 # @router.get("/all", response_model=list[schemas.ProfileResponse])
@@ -53,27 +94,66 @@ def view_portofolio(request: Request, db: Session = Depends(get_db)):
 #         profile.skills = skills
 #     return profiles
 
-# endpoint untuk mendapatkan semua portofolio beserta skill dan experience.
+def load_profiles_payload(db: Session) -> list[dict]:
+    """Load all profiles with their skills, experiences and projects as plain dicts.
+
+    One query per table, straight from the column values, so no ORM instances
+    are built for what is serialized to JSON right away.
+    """
+    profiles = {}
+    for row in db.execute(select(models.Profile.__table__).order_by(models.Profile.id)):
+        profile = dict(row._mapping)
+        profile.update(skills=[], experiences=[], projects=[])
+        profiles[profile["id"]] = profile
+
+    children = (
+        ("skills", models.Skill, (models.Skill.category, models.Skill.skill)),
+        ("experiences", models.Experience, (
+            models.Experience.company,
+            models.Experience.position,
+            models.Experience.start_date,
+            models.Experience.end_date,
+            models.Experience.description,
+        )),
+        ("projects", models.Project, (models.Project.name, models.Project.description, models.Project.link)),
+    )
+    for key, model, columns in children:
+        for row in db.execute(select(model.profile_id, *columns).order_by(model.id)):
+            item = dict(row._mapping)
+            profile = profiles.get(item.pop("profile_id"))
+            if profile is not None:
+                profile[key].append(item)
+
+    return list(profiles.values())
+
+# endpoint untuk mendapatkan semua portofolio beserta skill, experience dan project.
+# Response langsung diserialisasi (dan di-cache) sebagai JSON bytes, response_model hanya untuk dokumentasi.
 @router.get("/all", response_model=list[schemas.ProfileResponse])
-def get_profiles(db: Session = Depends(get_db)):
-    profiles = (
-        db.query(models.Profile)
-        .options(
-            selectinload(models.Profile.skills),
-            selectinload(models.Profile.experiences),
-            selectinload(models.Profile.projects),
-        )
-        .all()
+def get_profiles(db: Session = Depends(get_read_db)):
+    content = cache.get_or_set(
+        f"portfolio:all:{profiles.all_profiles_key(db)}",
+        lambda: utils.dump_json(schemas.ProfileListAdapter, load_profiles_payload(db)),
+        tags=("portfolio",),
     )
-    return profiles
+    return Response(content=content, media_type="application/json")
+
+# endpoint untuk menampilkan portofolio berdasarkan slug
+@router.get("/{slug}", response_class=HTMLResponse)
+def view_portofolio_by_slug(slug: str, request: Request, db: Session = Depends(get_read_db)):
+    key = profiles.profile_key_by_slug(db, slug)
+    if key is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return cached_profile_page(request, db, key)
 
 
 # endpoint untuk create portofolio baru
 @router.post("/create", status_code=status.HTTP_201_CREATED, response_model=schemas.ProfileResponse)
 def create_profile(new_profile: schemas.CreateProfile, db: Session = Depends(get_db), current_user: int = Depends(oauth2.get_current_user)):
     new_profile.userInput = current_user.id
-    new_profile = models.Profile(**new_profile.model_dump())
+    new_profile = models.Profile(**new_profile.model_dump(), slug=profiles.unique_slug(db, new_profile.name))
     db.add(new_profile)
+    db.flush()
+    profiles.set_default_profile(db, new_profile.id)
     db.commit()
     db.refresh(new_profile)
 
@@ -99,13 +179,14 @@ def update_profile(id: int, updated_profile: schemas.UpdateProfile, db: Session
 #endpoint untuk delete portofolio
 @router.delete("/delete/{id}", status_code=status.HTTP_204_NO_CONTENT) 
 def delete_profile(id: int, db: Session = Depends(get_db), current_user: int = Depends(oauth2.get_current_user)):
-    profile = db.query(models.Profile).filter(models.Profile.id == id).first()
-    if not profile:
+    owner_id = db.query(models.Profile.userInput).filter(models.Profile.id == id).scalar()
+    if owner_id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
-    if profile.userInput != current_user.id:
+    if owner_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this profile")
 
-    db.delete(profile)
+    # satu DELETE, skill/experience/project ikut terhapus lewat ON DELETE CASCADE
+    profiles.delete_profiles(db, [id], current_user.id)
     db.commit()
 
     return {"message": "Profile deleted successfully"}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, TypeAdapter
 from typing import Optional
 from datetime import datetime
 
@@ -7,6 +7,8 @@ class CreateUser(BaseModel):
     password: str
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     email: EmailStr
 
 class Userlogin(BaseModel):
@@ -35,6 +37,8 @@ class Skill(BaseModel):
     skill: str
 
 class SkillResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     category: str
     skill: str
 
@@ -51,6 +55,8 @@ class Experience(BaseModel):
     description: str
 
 class ExperienceResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     company: str
     position: str
     start_date: datetime
@@ -71,6 +77,8 @@ class Project(BaseModel):
     link: Optional[str] = None
 
 class ProjectResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     name: str
     description: str
     link: Optional[str] = None
@@ -79,7 +87,10 @@ class UpdateProject(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     link: Optional[str] = None
+
 class ProfileResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     userInput: int
     created_at: datetime
@@ -91,6 +102,10 @@ class ProfileResponse(BaseModel):
     image: Optional[str] = None
     skills: Optional[list[SkillResponse]] = []
     experiences: Optional[list[ExperienceResponse]] = []
+    projects: Optional[list[ProjectResponse]] = []
+
+# dipakai untuk serialisasi langsung ke JSON bytes tanpa validasi ulang oleh FastAPI
+ProfileListAdapter = TypeAdapter(list[ProfileResponse])
 
 class UpdateProfile(BaseModel):
     name: Optional[str] = None
@@ -0,0 +1,173 @@
+"""Production launcher: pre-forked uvicorn workers sharing one listening socket.
+
+The app is imported (and templates compiled) once in the master process before
+forking, so workers share that memory copy-on-write. The one-time startup
+writes (profile state, snapshot refresh) also run once in the master, instead
+of racing in every worker. Each worker drops the database pools it inherited,
+runs its own lifespan (job queue with recovery of left-over jobs, cache
+subscriber) and drains in-flight requests on SIGTERM. The master restarts
+workers that die and forwards SIGTERM/SIGINT for a graceful shutdown::
+
+    python -m app.server
+
+Configured through ``WEB_*`` settings and ``PORT`` (see ``app/config.py``).
+Linux/macOS only (uses ``os.fork``).
+"""
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+import uvicorn
+from .config import settings
+
+logger = logging.getLogger("app.server")
+
+# WEB_WORKERS=0 memakai jumlah CPU sampai batas ini: tiap worker punya pool koneksi sendiri
+# (DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW, default 15), 4 worker = maksimal 60 koneksi
+# dari max_connections PostgreSQL
+MAX_DEFAULT_WORKERS = 4
+
+# exit status worker yang gagal start atau crash, supaya master mencatatnya
+WORKER_FAILED = 1
+
+
+def preload():
+    """Import the app, do the one-time startup work and compile every template before forking."""
+    from . import database
+    from .main import app, prepare
+    from .templating import templates
+
+    prepare()
+    app.state.prepared = True
+
+    for name in templates.env.list_templates():
+        templates.env.get_template(name)
+
+    # koneksi yang sudah dibuka master (create_all) tidak boleh ikut ke worker
+    database.engine.dispose()
+    if database.replica_engine is not None:
+        database.replica_engine.dispose()
+    return app
+
+
+def bind_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((settings.web_host, settings.port))
+    sock.listen(settings.web_backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket) -> bool:
+    """Serve on ``sock`` until SIGTERM; returns False if the server failed to start."""
+    from . import database
+
+    # pool hasil fork dibuang tanpa menutup koneksi milik proses lain
+    database.engine.dispose(close=False)
+    if database.replica_engine is not None:
+        database.replica_engine.dispose(close=False)
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(
+        app,
+        timeout_keep_alive=settings.web_keepalive_seconds,
+        timeout_graceful_shutdown=settings.web_graceful_timeout_seconds,
+        backlog=settings.web_backlog,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.web_forwarded_allow_ips,
+        log_level=settings.web_log_level,
+        access_log=False,  # diganti access log JSON dari app/accesslog.py
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    return server.started
+
+
+class Master:
+    def __init__(self, app, sock: socket.socket, workers: int):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.children: dict[int, int] = {}
+        self.stopping = False
+
+    def spawn(self):
+        gc.collect()
+        gc.freeze()  # objek hasil preload tidak disentuh GC di worker, halaman memori tetap dibagi
+        pid = os.fork()
+        if pid == 0:
+            code = WORKER_FAILED
+            try:
+                if run_worker(self.app, self.sock):
+                    code = 0
+                else:
+                    logger.error("Worker %d failed to start", os.getpid())
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+            finally:
+                # os._exit tidak mem-flush stdio, traceback di atas harus sudah tertulis
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logger.info("Started worker %d", pid)
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info("Shutting down, draining %d worker(s)", len(self.children))
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        deadline = None
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if self.stopping:
+                    deadline = deadline or time.monotonic() + settings.web_graceful_timeout_seconds + 5
+                    if time.monotonic() > deadline:
+                        for child in self.children:
+                            os.kill(child, signal.SIGKILL)
+                time.sleep(0.2)
+                continue
+
+            started = self.children.pop(pid, None)
+            if self.stopping or started is None:
+                continue
+            logger.warning("Worker %d exited with status %d, restarting", pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < 1:
+                time.sleep(1)  # jangan restart terus-menerus kalau worker langsung crash
+            self.spawn()
+        self.sock.close()
+
+
+def main():
+    logging.basicConfig(level=settings.web_log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    workers = settings.web_workers or min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS)
+    app = preload()
+    sock = bind_socket()
+    logger.info("Listening on %s:%d with %d worker(s)", settings.web_host, settings.port, workers)
+    Master(app, sock, workers).run()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
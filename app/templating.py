@@ -0,0 +1,12 @@
+"""The one Jinja environment shared by the app, the admin and the static snapshot.
+
+A single instance means each template is compiled once per process, and once
+for all workers when ``app/server.py`` compiles them before forking.
+"""
+from pathlib import Path
+from fastapi.templating import Jinja2Templates
+from . import assets, accesslog
+
+templates = Jinja2Templates(directory=str(Path(__file__).resolve().parent / "templates"))
+assets.install(templates.env)
+accesslog.install(templates.env)
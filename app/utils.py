@@ -1,9 +1,21 @@
 from pwdlib import PasswordHash
+from pydantic import TypeAdapter
+from .accesslog import phase
 
 password_hash = PasswordHash.recommended()
 
 def hash_password(password: str):
-    return password_hash.hash(password)
+    with phase("auth"):
+        return password_hash.hash(password)
 
 def verify_password(input_password: str, hased_password:str):
-    return password_hash.verify(input_password, hased_password)
+    with phase("auth"):
+        return password_hash.verify(input_password, hased_password)
+
+def dump_json(adapter: TypeAdapter, data) -> bytes:
+    """Validate data once and serialize it straight to JSON bytes with pydantic-core.
+
+    Returned as a Response, the bytes skip FastAPI's own response_model validation
+    and encoding, so the payload is only walked once.
+    """
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
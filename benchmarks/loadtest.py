@@ -0,0 +1,299 @@
+"""Reproducible load test for the public and admin paths.
+
+Seeds a local database, starts the app under uvicorn, drives each scenario at a
+fixed concurrency and reports p50/p95/p99 latency, throughput and server memory.
+Results are written to ``benchmarks/results/`` so runs can be compared::
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.loadtest --profiles 50 --requests 500 --concurrency 16
+    python -m benchmarks.loadtest --compare benchmarks/results/<previous>.json
+
+``--database-url`` defaults to a SQLite file; pass a PostgreSQL URL
+(``postgresql+psycopg://user:pw@localhost/bench``) to benchmark the real driver.
+The target database is dropped and re-created on every run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SCENARIOS = [
+    "home",
+    "portfolio",
+    "portfolio_all",
+    "auth_login",
+    "admin_dashboard",
+    "admin_skill_create",
+    "admin_profile_edit",
+    "admin_skill_delete",
+]
+
+# skenario auth_login mengukur login, bukan rate limiter (default 20/IP dan 5/email per
+# menit, 4 hash bersamaan); limit di-set longgar untuk server benchmark
+SERVER_ENV = {
+    "RATE_LIMIT_PER_IP": "1000000",
+    "RATE_LIMIT_PER_EMAIL": "1000000",
+    "AUTH_MAX_CONCURRENT_HASHES": "1000",
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=f"sqlite:///{BASE_DIR / 'benchmarks' / 'bench.db'}")
+    parser.add_argument("--profiles", type=int, default=10)
+    parser.add_argument("--skills", type=int, default=20, help="skills per profile")
+    parser.add_argument("--experiences", type=int, default=5, help="experiences per profile")
+    parser.add_argument("--projects", type=int, default=5, help="projects per profile")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--server-args", default="", help="extra arguments passed to uvicorn")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--label", default="", help="free-form label stored with the results")
+    parser.add_argument("--output", type=Path, default=None, help="result file (default: results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="previous result file to compare against")
+    return parser.parse_args(argv)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def read_memory(pid: int) -> dict:
+    """Resident and peak memory of the server process in KiB (Linux only)."""
+    status = Path(f"/proc/{pid}/status")
+    if not status.exists():
+        return {}
+    memory = {}
+    for line in status.read_text().splitlines():
+        key, _, value = line.partition(":")
+        if key in ("VmRSS", "VmHWM"):
+            memory["rss_kib" if key == "VmRSS" else "peak_rss_kib"] = int(value.split()[0])
+    return memory
+
+
+class Server:
+    def __init__(self, database_url: str, port: int, extra_args: str = ""):
+        self.port = port or free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        env = {**os.environ, **SERVER_ENV, "DATABASE_URL": database_url}
+        cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(self.port), "--log-level", "warning"]
+        cmd += extra_args.split()
+        self.process = subprocess.Popen(cmd, cwd=BASE_DIR, env=env)
+
+    async def wait_ready(self, client, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"server exited with code {self.process.returncode}")
+            try:
+                await client.get(self.base_url + "/")
+                return
+            except Exception:
+                await asyncio.sleep(0.2)
+        raise RuntimeError("server did not become ready")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def build_scenarios(seeded, admin_headers: dict) -> dict:
+    """Return scenario name -> function(i) producing httpx request arguments."""
+    from benchmarks.seed import BENCH_EMAIL, BENCH_PASSWORD
+
+    profile_id = seeded.profile_ids[0]
+    disposable = seeded.disposable_skill_ids
+    profile_form = {
+        "name": "Profile 0",
+        "age": "25",
+        "education": "S1 Teknik Informatika",
+        "university": "Universitas 0",
+        "biography": "Updated by the benchmark.",
+    }
+    return {
+        "home": lambda i: ("GET", "/", {}),
+        "portfolio": lambda i: ("GET", "/portofolio/", {}),
+        "portfolio_all": lambda i: ("GET", "/portofolio/all", {}),
+        "auth_login": lambda i: ("POST", "/auth/login", {"data": {"username": BENCH_EMAIL, "password": BENCH_PASSWORD}}),
+        "admin_dashboard": lambda i: ("GET", "/admin/dashboard", {"headers": admin_headers}),
+        "admin_skill_create": lambda i: (
+            "POST",
+            f"/admin/profile/{profile_id}/skills/create",
+            {"data": {"category": "Bench", "skill": f"Bench {i}"}, "headers": admin_headers},
+        ),
+        "admin_profile_edit": lambda i: (
+            "POST",
+            f"/admin/profile/{profile_id}/edit",
+            {"data": profile_form, "headers": admin_headers},
+        ),
+        "admin_skill_delete": lambda i: (
+            "POST",
+            f"/admin/profile/{profile_id}/skills/{disposable[i % len(disposable)]}/delete",
+            {"headers": admin_headers},
+        ),
+    }
+
+
+async def run_scenario(client, base_url: str, make_request, total: int, concurrency: int, offset: int = 0) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, path, kwargs = make_request(offset + i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, base_url + path, **kwargs)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+
+    os.environ["DATABASE_URL"] = args.database_url
+    sys.path.insert(0, str(BASE_DIR))
+    from benchmarks.seed import BENCH_EMAIL, BENCH_PASSWORD, SeedConfig, seed
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    config = SeedConfig(
+        profiles=max(args.profiles, 1),
+        skills=args.skills,
+        experiences=args.experiences,
+        projects=args.projects,
+        disposable_skills=args.requests + args.warmup if "admin_skill_delete" in names else 0,
+    )
+    seed_start = time.perf_counter()
+    seeded = seed(config)
+    seed_elapsed = time.perf_counter() - seed_start
+
+    server = Server(args.database_url, args.port, args.server_args)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=60.0, follow_redirects=False) as client:
+            await server.wait_ready(client)
+            login = await client.post(server.base_url + "/admin/login", data={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+            admin_headers = {"Cookie": f"admin_token={login.cookies.get('admin_token', '')}"}
+            client.cookies.clear()
+            scenarios = build_scenarios(seeded, admin_headers)
+
+            for name in names:
+                make_request = scenarios[name]
+                if args.warmup:
+                    await run_scenario(client, server.base_url, make_request, args.warmup, args.concurrency)
+                result = await run_scenario(
+                    client, server.base_url, make_request, args.requests, args.concurrency, offset=args.warmup
+                )
+                result["memory"] = read_memory(server.process.pid)
+                results[name] = result
+                print(format_row(name, result), flush=True)
+    finally:
+        server.stop()
+
+    return {
+        "label": args.label,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": args.database_url.split("://", 1)[0],
+        "concurrency": args.concurrency,
+        "dataset": vars(config),
+        "seed_s": round(seed_elapsed, 3),
+        "scenarios": results,
+    }
+
+
+def format_row(name: str, result: dict) -> str:
+    lat = result["latency_ms"]
+    rss = result.get("memory", {}).get("rss_kib")
+    rss_text = f"{rss / 1024:8.1f}MiB" if rss else "       n/a"
+    return (
+        f"{name:<20} {result['throughput_rps']:>9.1f} req/s  p50 {lat['p50']:>8.2f}ms  "
+        f"p95 {lat['p95']:>8.2f}ms  p99 {lat['p99']:>8.2f}ms  err {result['errors']:>4}  rss {rss_text}"
+    )
+
+
+def compare(current: dict, previous: dict):
+    print(f"\nComparison with {previous.get('timestamp')} {previous.get('label', '')}".rstrip())
+    for name, result in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        rps_delta = (result["throughput_rps"] / before["throughput_rps"] - 1) * 100 if before["throughput_rps"] else 0.0
+        p95_delta = (
+            (result["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1) * 100 if before["latency_ms"]["p95"] else 0.0
+        )
+        print(f"{name:<20} throughput {rps_delta:+7.1f}%   p95 {p95_delta:+7.1f}%")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Seed a benchmark database with synthetic profiles, skills, experiences and projects.
+
+The database is chosen through ``DATABASE_URL`` (see ``app/config.py``), so this
+must be set before ``app`` is imported.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+
+
+@dataclass
+class SeedConfig:
+    profiles: int = 10
+    skills: int = 20
+    experiences: int = 5
+    projects: int = 5
+    # extra skills on the first profile, consumed by the admin delete flow
+    disposable_skills: int = 0
+
+
+@dataclass
+class SeedResult:
+    user_id: int
+    profile_ids: list[int]
+    disposable_skill_ids: list[int]
+
+
+def seed(config: SeedConfig) -> SeedResult:
+    from app import models, utils
+    from app.database import Sessionlocal, engine
+
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+
+    db = Sessionlocal()
+    try:
+        user = models.UserLogin(email=BENCH_EMAIL, password=utils.hash_password(BENCH_PASSWORD))
+        db.add(user)
+        db.flush()
+
+        profiles = [
+            models.Profile(
+                userInput=user.id,
+                name=f"Profile {i}",
+                age=20 + i % 30,
+                education="S1 Teknik Informatika",
+                university=f"Universitas {i}",
+                biography="Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 5,
+            )
+            for i in range(config.profiles)
+        ]
+        db.add_all(profiles)
+        db.flush()
+        profile_ids = [p.id for p in profiles]
+
+        rows_skills, rows_experiences, rows_projects = [], [], []
+        for profile_id in profile_ids:
+            rows_skills += [
+                {"profile_id": profile_id, "category": f"Category {j % 4}", "skill": f"Skill {j}"}
+                for j in range(config.skills)
+            ]
+            rows_experiences += [
+                {
+                    "profile_id": profile_id,
+                    "company": f"Company {j}",
+                    "position": "Software Engineer",
+                    "start_date": date(2015, 1, 1) + timedelta(days=180 * j),
+                    "end_date": None if j == config.experiences - 1 else date(2015, 1, 1) + timedelta(days=180 * (j + 1)),
+                    "description": "Built and maintained services. " * 4,
+                }
+                for j in range(config.experiences)
+            ]
+            rows_projects += [
+                {
+                    "profile_id": profile_id,
+                    "name": f"Project {j}",
+                    "description": "A side project with a reasonably long description. " * 4,
+                    "link": f"https://example.com/project/{j}",
+                }
+                for j in range(config.projects)
+            ]
+        if rows_skills:
+            db.bulk_insert_mappings(models.Skill, rows_skills)
+        if rows_experiences:
+            db.bulk_insert_mappings(models.Experience, rows_experiences)
+        if rows_projects:
+            db.bulk_insert_mappings(models.Project, rows_projects)
+
+        disposable = [
+            models.Skill(profile_id=profile_ids[0], category="Disposable", skill=f"Disposable {j}")
+            for j in range(config.disposable_skills if profile_ids else 0)
+        ]
+        db.add_all(disposable)
+        db.commit()
+
+        return SeedResult(
+            user_id=user.id,
+            profile_ids=profile_ids,
+            disposable_skill_ids=[s.id for s in disposable],
+        )
+    finally:
+        db.close()
@@ -0,0 +1,103 @@
+"""Compare JSON serialization paths for ``GET /portofolio/all``.
+
+* ``legacy``  - ORM objects, response_model validation, ``jsonable_encoder`` and
+  ``json.dumps`` (what FastAPI did before serializing with pydantic-core).
+* ``fastapi`` - ORM objects, response_model validation and pydantic-core
+  ``dump_json`` (FastAPI's current default path).
+* ``fast``    - ``load_profiles_payload`` column rows, one validation pass and
+  ``dump_json`` (what ``get_profiles`` returns now).
+
+::
+
+    python -m benchmarks.serialization --profiles 3000 --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=f"sqlite:///{BASE_DIR / 'benchmarks' / 'bench.db'}")
+    parser.add_argument("--profiles", type=int, default=3000)
+    parser.add_argument("--skills", type=int, default=10)
+    parser.add_argument("--experiences", type=int, default=3)
+    parser.add_argument("--projects", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the existing database contents")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from fastapi.encoders import jsonable_encoder
+    from sqlalchemy.orm import selectinload
+
+    from app import models, schemas
+    from app.database import Sessionlocal
+    from app.routers.portofolio import load_profiles_payload
+    from benchmarks.seed import SeedConfig, seed
+
+    if not args.no_seed:
+        seed(SeedConfig(args.profiles, args.skills, args.experiences, args.projects))
+
+    adapter = schemas.ProfileListAdapter
+
+    def load_orm(db):
+        return (
+            db.query(models.Profile)
+            .options(
+                selectinload(models.Profile.skills),
+                selectinload(models.Profile.experiences),
+                selectinload(models.Profile.projects),
+            )
+            .order_by(models.Profile.id)
+            .all()
+        )
+
+    def legacy(db):
+        validated = adapter.validate_python(load_orm(db), from_attributes=True)
+        return json.dumps(jsonable_encoder(adapter.dump_python(validated))).encode()
+
+    def fastapi_default(db):
+        return adapter.dump_json(adapter.validate_python(load_orm(db), from_attributes=True))
+
+    def fast(db):
+        return adapter.dump_json(adapter.validate_python(load_profiles_payload(db), from_attributes=True))
+
+    paths = {"legacy": legacy, "fastapi": fastapi_default, "fast": fast}
+    outputs = {}
+    timings = {}
+    for name, func in paths.items():
+        samples = []
+        for _ in range(args.repeat):
+            db = Sessionlocal()
+            try:
+                start = time.perf_counter()
+                outputs[name] = func(db)
+                samples.append(time.perf_counter() - start)
+            finally:
+                db.close()
+        timings[name] = samples
+
+    # legacy only differs in datetime formatting ("+00:00" instead of "Z")
+    reference = json.loads(outputs["fastapi"])
+    if json.loads(outputs["fast"]) != reference:
+        raise SystemExit("fast output differs from the response_model output")
+
+    base = statistics.median(timings["legacy"])
+    print(f"{len(reference)} profiles, {len(outputs['fast']) / 1024:.0f} KiB payload, median of {args.repeat} runs")
+    for name, samples in timings.items():
+        median = statistics.median(samples)
+        print(f"{name:<8} {median * 1000:9.1f} ms   x{base / median:5.2f} vs legacy")
+
+
+if __name__ == "__main__":
+    main()
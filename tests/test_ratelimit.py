@@ -0,0 +1,60 @@
+"""Per-IP rate limit behind a proxy: the client IP comes from uvicorn's proxy handling.
+
+    python -m unittest tests.test_ratelimit
+"""
+import unittest
+from unittest import mock
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app import ratelimit
+from app.config import settings
+
+LIMIT = 2
+
+
+def _client(trusted_hosts: str) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/login", dependencies=[Depends(ratelimit.rate_limit("test"))])
+    def login():
+        return {}
+
+    # middleware yang sama dengan yang dipasang uvicorn dari proxy_headers/forwarded_allow_ips
+    return TestClient(ProxyHeadersMiddleware(app, trusted_hosts=trusted_hosts))
+
+
+class ClientIpRateLimitTest(unittest.TestCase):
+    def setUp(self):
+        for patcher in (
+            mock.patch.object(ratelimit, "backend", ratelimit.InMemoryBackend()),
+            mock.patch.object(settings, "rate_limit_per_ip", LIMIT),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _statuses(self, client: TestClient, forwarded_for: list[str]) -> list[int]:
+        return [client.post("/login", headers={"X-Forwarded-For": value}).status_code for value in forwarded_for]
+
+    def test_spoofed_leftmost_entries_share_one_bucket(self):
+        # TestClient terhubung sebagai "testclient", di sini berperan sebagai proxy yang dipercaya
+        client = _client("testclient")
+        statuses = self._statuses(client, [f"10.0.0.{i}, 1.2.3.4" for i in range(6)])
+        self.assertEqual(statuses, [200] * LIMIT + [429] * (6 - LIMIT))
+
+    def test_clients_behind_the_proxy_have_separate_buckets(self):
+        client = _client("testclient")
+        self.assertEqual(self._statuses(client, ["1.2.3.4"] * LIMIT), [200] * LIMIT)
+        self.assertEqual(self._statuses(client, ["5.6.7.8"] * LIMIT), [200] * LIMIT)
+        self.assertEqual(self._statuses(client, ["1.2.3.4"]), [429])
+
+    def test_forwarded_for_from_untrusted_peer_is_ignored(self):
+        client = _client("127.0.0.1")
+        statuses = self._statuses(client, [f"10.0.0.{i}" for i in range(6)])
+        self.assertEqual(statuses, [200] * LIMIT + [429] * (6 - LIMIT))
+
+
+if __name__ == "__main__":
+    unittest.main()